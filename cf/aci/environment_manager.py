@@ -1,12 +1,91 @@
 """Environment Manager for CodeFusion Agent Computer Interface."""
 
-import json
-import requests
 from typing import Dict, List, Optional, Any
 from .repo import CodeRepo
 from ..config import CfConfig
 
 
+# Documentation sites for common technologies
+_DOC_SITES = {
+    "python": "https://docs.python.org/3/",
+    "javascript": "https://developer.mozilla.org/",
+    "react": "https://reactjs.org/docs/",
+    "django": "https://docs.djangoproject.com/",
+    "flask": "https://flask.palletsprojects.com/",
+    "nodejs": "https://nodejs.org/docs/",
+    "typescript": "https://www.typescriptlang.org/docs/",
+}
+
+# Language names by file extension
+_EXTENSION_LANGUAGES = {
+    ".py": "python",
+    ".js": "javascript", 
+    ".ts": "typescript",
+    ".jsx": "javascript",
+    ".tsx": "typescript",
+    ".java": "java",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".cs": "csharp",
+    ".go": "go",
+    ".rs": "rust",
+    ".php": "php",
+    ".rb": "ruby",
+    ".swift": "swift",
+    ".kt": "kotlin",
+    ".scala": "scala",
+    ".html": "html",
+    ".css": "css",
+    ".scss": "scss",
+    ".sass": "sass",
+    ".less": "less",
+    ".sql": "sql",
+    ".md": "markdown",
+    ".json": "json",
+    ".xml": "xml",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".toml": "toml",
+    ".ini": "ini",
+    ".cfg": "config",
+    ".conf": "config"
+}
+
+# Technology suggested by each source file extension
+_TECH_INDICATORS = {
+    ".py": "Python",
+    ".js": "JavaScript", 
+    ".ts": "TypeScript",
+    ".jsx": "React",
+    ".tsx": "React with TypeScript",
+    ".java": "Java",
+    ".cpp": "C++",
+    ".c": "C",
+    ".cs": "C#",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".php": "PHP",
+    ".rb": "Ruby",
+    ".swift": "Swift",
+    ".kt": "Kotlin"
+}
+
+# Marker files and the project property each one implies
+_PROJECT_MARKER_FILES = [
+    ("package.json", "package_manager", "npm"),
+    ("requirements.txt", "package_manager", "pip"),
+    ("Pipfile", "package_manager", "pipenv"),
+    ("poetry.lock", "package_manager", "poetry"),
+    ("Cargo.toml", "package_manager", "cargo"),
+    ("pom.xml", "build_system", "maven"),
+    ("build.gradle", "build_system", "gradle"),
+    ("Makefile", "build_system", "make"),
+    ("CMakeLists.txt", "build_system", "cmake"),
+    ("setup.py", "build_system", "setuptools"),
+    ("pyproject.toml", "build_system", "modern_python")
+]
+
+
 class EnvironmentManager:
     """Environment class that combines CodeRepo with internet and search capabilities."""
     
@@ -35,18 +114,7 @@ class EnvironmentManager:
     
     def search_documentation(self, technology: str, query: str) -> List[Dict[str, str]]:
         """Search documentation for specific technologies."""
-        # Map common technologies to their documentation sites
-        doc_sites = {
-            "python": "https://docs.python.org/3/",
-            "javascript": "https://developer.mozilla.org/",
-            "react": "https://reactjs.org/docs/",
-            "django": "https://docs.djangoproject.com/",
-            "flask": "https://flask.palletsprojects.com/",
-            "nodejs": "https://nodejs.org/docs/",
-            "typescript": "https://www.typescriptlang.org/docs/",
-        }
-        
-        base_url = doc_sites.get(technology.lower())
+        base_url = _DOC_SITES.get(technology.lower())
         if not base_url:
             return self.search_web(f"{technology} {query} documentation")
         
@@ -75,41 +143,7 @@ class EnvironmentManager:
             }
             
             # Basic language detection based on extension
-            language_map = {
-                ".py": "python",
-                ".js": "javascript", 
-                ".ts": "typescript",
-                ".jsx": "javascript",
-                ".tsx": "typescript",
-                ".java": "java",
-                ".cpp": "cpp",
-                ".c": "c",
-                ".cs": "csharp",
-                ".go": "go",
-                ".rs": "rust",
-                ".php": "php",
-                ".rb": "ruby",
-                ".swift": "swift",
-                ".kt": "kotlin",
-                ".scala": "scala",
-                ".html": "html",
-                ".css": "css",
-                ".scss": "scss",
-                ".sass": "sass",
-                ".less": "less",
-                ".sql": "sql",
-                ".md": "markdown",
-                ".json": "json",
-                ".xml": "xml",
-                ".yaml": "yaml",
-                ".yml": "yaml",
-                ".toml": "toml",
-                ".ini": "ini",
-                ".cfg": "config",
-                ".conf": "config"
-            }
-            
-            analysis["language"] = language_map.get(file_info.extension.lower(), "unknown")
+            analysis["language"] = _EXTENSION_LANGUAGES.get(file_info.extension.lower(), "unknown")
             
             # Extract basic patterns for code files
             if analysis["language"] in ["python", "javascript", "typescript", "java", "cpp", "c"]:
@@ -178,29 +212,11 @@ class EnvironmentManager:
         stats = self.code_repo.get_repository_stats()
         
         # Analyze file types and suggest technologies
-        tech_indicators = {
-            ".py": "Python",
-            ".js": "JavaScript", 
-            ".ts": "TypeScript",
-            ".jsx": "React",
-            ".tsx": "React with TypeScript",
-            ".java": "Java",
-            ".cpp": "C++",
-            ".c": "C",
-            ".cs": "C#",
-            ".go": "Go",
-            ".rs": "Rust",
-            ".php": "PHP",
-            ".rb": "Ruby",
-            ".swift": "Swift",
-            ".kt": "Kotlin"
-        }
-        
         detected_technologies = []
         for ext, count in stats["file_types"].items():
-            if ext in tech_indicators and count > 0:
+            if ext in _TECH_INDICATORS and count > 0:
                 detected_technologies.append({
-                    "technology": tech_indicators[ext],
+                    "technology": _TECH_INDICATORS[ext],
                     "extension": ext,
                     "file_count": count
                 })
@@ -228,21 +244,7 @@ class EnvironmentManager:
         }
         
         # Check for common files and directories
-        common_checks = [
-            ("package.json", "package_manager", "npm"),
-            ("requirements.txt", "package_manager", "pip"),
-            ("Pipfile", "package_manager", "pipenv"),
-            ("poetry.lock", "package_manager", "poetry"),
-            ("Cargo.toml", "package_manager", "cargo"),
-            ("pom.xml", "build_system", "maven"),
-            ("build.gradle", "build_system", "gradle"),
-            ("Makefile", "build_system", "make"),
-            ("CMakeLists.txt", "build_system", "cmake"),
-            ("setup.py", "build_system", "setuptools"),
-            ("pyproject.toml", "build_system", "modern_python")
-        ]
-        
-        for file_name, category, value in common_checks:
+        for file_name, category, value in _PROJECT_MARKER_FILES:
             if self.code_repo.exists(file_name):
                 structure[category] = value
         
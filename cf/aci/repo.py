@@ -2,6 +2,7 @@
 
 import os
 import fnmatch
+import heapq
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Iterator, Tuple
@@ -227,9 +228,8 @@ class LocalCodeRepo(CodeRepo):
                 # Track largest files
                 files_by_size.append((file_info.path, file_info.size))
         
-        # Get top 10 largest files
-        files_by_size.sort(key=lambda x: x[1], reverse=True)
-        stats["largest_files"] = files_by_size[:10]
+        # Get top 10 largest files without sorting every file
+        stats["largest_files"] = heapq.nlargest(10, files_by_size, key=lambda x: x[1])
         
         return stats
 
@@ -1,4 +1,14 @@
-"""Agents module for CodeFusion agentic exploration strategies."""
+"""Agents module for CodeFusion agentic exploration strategies.
+
+The agents share a few conventions for talking to the LLM:
+
+- Static instructions go in the leading system message, so every request
+  shares a byte-identical prefix that providers can cache.
+- JSON is pulled out of replies with a module-level ``json.JSONDecoder``'s
+  ``raw_decode``, which skips any prose or markdown fence around it.
+- An existing ``SystemAccess`` can be passed in, so the .env file is parsed
+  only once per run.
+"""
 
 from .reasoning_agent import ReasoningAgent, ReasoningResult, ReasoningStep
 from ..aci.system_access import SystemAccess
@@ -1,7 +1,9 @@
 """Plan-then-act exploration strategy for CodeFusion."""
 
 import os
+import heapq
 import json
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
@@ -17,6 +19,27 @@ from ..config import CfConfig
 from ..aci.system_access import SystemAccess
 
 
+# Directory names worth exploring first, and those used to fill up the list
+_HIGH_PRIORITY_DIRS = frozenset({'src', 'lib', 'app', 'main', 'core', 'api'})
+_MEDIUM_PRIORITY_DIRS = frozenset({'tests', 'test', 'docs', 'config', 'utils', 'helpers'})
+
+# Directory name fragments that suggest API code
+_API_DIR_TERMS = ('api', 'route', 'endpoint')
+
+_JSON_DECODER = json.JSONDecoder()
+
+# System prompt for plan creation
+_PLAN_SYSTEM_PROMPT = """You create exploration plans for answering questions about a codebase. Create a JSON plan with:
+1. goal: Clear objective
+2. priority_areas: List of 3-5 key directories/files to focus on
+3. exploration_steps: List of 5-8 specific actions to take
+4. expected_entities: List of code entities (classes, functions, files) we expect to find
+5. success_criteria: List of criteria to determine if exploration was successful
+6. estimated_time: Estimated time in minutes
+
+Return only the JSON object."""
+
+
 @dataclass
 class ExplorationPlan:
     """Plan for exploring a codebase."""
@@ -49,16 +72,27 @@ class PlanResult:
     insights: List[str]
     success_rate: float
     execution_time: int
+    
+    def to_summary(self) -> Dict[str, Any]:
+        """Lightweight view without executed steps or entity objects."""
+        return {
+            "goal": self.plan.goal,
+            "insights": list(self.insights),
+            "success_rate": self.success_rate,
+            "execution_time": self.execution_time,
+        }
 
 
 class PlanThenActAgent:
     """Agent that creates a plan before exploring the codebase."""
     
-    def __init__(self, config: CfConfig, kb: CodeKB):
+    def __init__(self, config: CfConfig, kb: CodeKB,
+                 system_access: Optional[SystemAccess] = None):
         self.config = config
         self.kb = kb
-        self.system_access = SystemAccess()
+        self.system_access = system_access or SystemAccess()
         self.llm_available = LITELLM_AVAILABLE and self.system_access.has_llm_config()
+        self.max_step_workers = 4
         
         if self.llm_available:
             self._setup_llm()
@@ -94,26 +128,24 @@ class PlanThenActAgent:
         prompt = f"""Create an exploration plan for this codebase question: "{question}"
 
 Directory structure:
-{structure_analysis}
-
-Create a JSON plan with:
-1. goal: Clear objective
-2. priority_areas: List of 3-5 key directories/files to focus on
-3. exploration_steps: List of 5-8 specific actions to take
-4. expected_entities: List of code entities (classes, functions, files) we expect to find
-5. success_criteria: List of criteria to determine if exploration was successful
-6. estimated_time: Estimated time in minutes
-
-Return only the JSON object."""
+{structure_analysis}"""
         
         try:
             response = litellm.completion(
                 model=self.config.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.1
+                messages=[
+                    {"role": "system", "content": _PLAN_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,
+                # Ask for a bare JSON object so the reply parses in one pass
+                response_format={"type": "json_object"},
+                drop_params=True
             )
             
-            plan_data = json.loads(response.choices[0].message.content)
+            # Parse the first JSON object in the reply
+            content = response.choices[0].message.content
+            plan_data, _ = _JSON_DECODER.raw_decode(content, content.index('{'))
             return ExplorationPlan(**plan_data)
             
         except Exception as e:
@@ -188,7 +220,7 @@ Return only the JSON object."""
                         # Show important subdirectories
                         subdirs = [d for d in item.iterdir() if d.is_dir() and not d.name.startswith('.')]
                         if subdirs:
-                            for subdir in sorted(subdirs)[:3]:  # Show top 3 subdirs
+                            for subdir in heapq.nsmallest(3, subdirs):  # Show top 3 subdirs
                                 structure_lines.append(f"  📁 {subdir.name}/")
                     except PermissionError:
                         structure_lines.append(f"📁 {item.name}/ (access denied)")
@@ -205,34 +237,29 @@ Return only the JSON object."""
         """Identify priority areas based on structure and question."""
         priority_areas = []
         
-        # Extract directory names from structure
+        # Extract directory names from structure, lowercased once for matching
         lines = structure_analysis.split('\n')
-        directories = [line.split()[1].rstrip('/') for line in lines if line.startswith('📁')]
-        
-        # Priority based on common patterns
-        high_priority = ['src', 'lib', 'app', 'main', 'core', 'api']
-        medium_priority = ['tests', 'test', 'docs', 'config', 'utils', 'helpers']
+        directories = [
+            (name, name.lower())
+            for name in (line.split()[1].rstrip('/') for line in lines if line.startswith('📁'))
+        ]
         
         # Question-specific priorities
         if 'test' in question:
-            priority_areas.extend([d for d in directories if 'test' in d.lower()])
+            priority_areas.extend([d for d, lowered in directories if 'test' in lowered])
         if 'config' in question:
-            priority_areas.extend([d for d in directories if 'config' in d.lower()])
+            priority_areas.extend([d for d, lowered in directories if 'config' in lowered])
         if 'api' in question:
-            priority_areas.extend([d for d in directories if any(term in d.lower() for term in ['api', 'route', 'endpoint'])])
+            priority_areas.extend([d for d, lowered in directories if any(term in lowered for term in _API_DIR_TERMS)])
         
         # Add high priority directories
-        for dir_name in directories:
-            if dir_name.lower() in high_priority:
-                priority_areas.append(dir_name)
+        priority_areas.extend(d for d, lowered in directories if lowered in _HIGH_PRIORITY_DIRS)
         
         # Add medium priority if not enough areas
         if len(priority_areas) < 3:
-            for dir_name in directories:
-                if dir_name.lower() in medium_priority:
-                    priority_areas.append(dir_name)
+            priority_areas.extend(d for d, lowered in directories if lowered in _MEDIUM_PRIORITY_DIRS)
         
-        return list(set(priority_areas))[:5]  # Return top 5 unique areas
+        return list(dict.fromkeys(priority_areas))[:5]  # Return top 5 unique areas, in priority order
     
     def _execute_plan(self, plan: ExplorationPlan, repo_path: str) -> PlanResult:
         """Execute the exploration plan."""
@@ -245,32 +272,38 @@ Return only the JSON object."""
         print(f"⏱️  Estimated Time: {plan.estimated_time} minutes")
         print()
         
-        # Execute each step
-        for i, step_desc in enumerate(plan.exploration_steps, 1):
-            step = PlanStep(
+        steps = [
+            PlanStep(
                 step_id=f"step_{i}",
                 description=step_desc,
                 action_type=self._classify_action_type(step_desc),
                 target_paths=self._determine_target_paths(step_desc, plan.priority_areas, repo_path),
                 expected_findings=[]
             )
+            for i, step_desc in enumerate(plan.exploration_steps, 1)
+        ]
+        
+        # Steps only read the repository and KB, so run them concurrently;
+        # output is printed from this thread, in plan order, so it doesn't interleave
+        with ThreadPoolExecutor(max_workers=self.max_step_workers) as executor:
+            futures = [executor.submit(self._execute_step, step, repo_path) for step in steps]
             
-            print(f"🔍 Step {i}: {step_desc}")
-            
-            # Execute the step
-            step_results = self._execute_step(step, repo_path)
-            step.results = step_results
-            step.completed = True
-            
-            # Extract entities and insights
-            step_entities = self._extract_entities_from_results(step_results)
-            discovered_entities.extend(step_entities)
-            
-            step_insights = self._extract_insights_from_results(step_results, step_desc)
-            insights.extend(step_insights)
-            
-            executed_steps.append(step)
-            print(f"   ✅ Found {len(step_entities)} entities, {len(step_insights)} insights")
+            for i, (step, future) in enumerate(zip(steps, futures), 1):
+                print(f"🔍 Step {i}: {step.description}")
+                
+                step_results = future.result()
+                step.results = step_results
+                step.completed = True
+                
+                # Extract entities and insights
+                step_entities = self._extract_entities_from_results(step_results)
+                discovered_entities.extend(step_entities)
+                
+                step_insights = self._extract_insights_from_results(step_results, step.description)
+                insights.extend(step_insights)
+                
+                executed_steps.append(step)
+                print(f"   ✅ Found {len(step_entities)} entities, {len(step_insights)} insights")
         
         # Calculate success rate
         success_rate = len([s for s in executed_steps if s.completed]) / len(executed_steps)
@@ -349,7 +382,8 @@ Return only the JSON object."""
         
         elif step.action_type == "trace_relationships":
             # Use knowledge base to find relationships
-            entities = self.kb.search_entities("", limit=50)
+            # search_entities takes no limit on every KB type, so slice instead
+            entities = self.kb.search_entities("")[:50]
             relationship_analysis = self._analyze_entity_relationships(entities)
             results.extend(relationship_analysis)
         
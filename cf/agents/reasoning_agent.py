@@ -2,8 +2,12 @@
 
 import os
 import json
-from typing import List, Dict, Any, Optional, Tuple
-from dataclasses import dataclass
+import asyncio
+import copy
+import hashlib
+import threading
+from typing import Callable, List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, replace
 from pathlib import Path
 
 try:
@@ -15,6 +19,45 @@ except ImportError:
 from ..kb.knowledge_base import CodeEntity
 from ..kb.content_analyzer import ContentAnalyzer, AnalyzedAnswer
 from ..config import CfConfig
+from ..cache import LruCache
+from ..llm.llm_model import completion_with_retries
+
+
+# Shared empty fallback for lookups that would otherwise allocate a list
+_EMPTY_TUPLE: Tuple = ()
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Guards both caches below, which are shared by concurrent requests
+_CACHE_LOCK = threading.Lock()
+
+# Reasoning results keyed by normalized question and context, evicted LRU-first
+_RESULT_CACHE_SIZE = 64
+_RESULT_CACHE = LruCache(_RESULT_CACHE_SIZE)
+
+# Sub-question analyses keyed by normalized sub-question and context, so a
+# reworded question that decomposes the same way reuses them
+_ANALYSIS_CACHE_SIZE = 256
+_ANALYSIS_CACHE = LruCache(_ANALYSIS_CACHE_SIZE)
+
+# System prompts for question decomposition and answer synthesis
+_DECOMPOSITION_SYSTEM_PROMPT = """You break down questions about a codebase into 3-5 specific sub-questions that need to be answered to provide a comprehensive response. Focus on:
+1. Installation/setup procedures
+2. Configuration requirements
+3. Code examples and usage
+4. Troubleshooting common issues
+5. Best practices
+
+Return the sub-questions as a JSON array of strings."""
+
+_SYNTHESIS_SYSTEM_PROMPT = """You answer questions about a codebase from a prior analysis of it. Provide a comprehensive, detailed answer that includes:
+1. Step-by-step procedures (if applicable)
+2. Configuration details with examples
+3. Code snippets with context
+4. Common troubleshooting tips
+5. Best practices and recommendations
+
+Format the answer with clear sections and examples."""
 
 
 @dataclass
@@ -25,6 +68,8 @@ class ReasoningStep:
     entities_used: List[str]
     confidence: float
     step_type: str  # "decomposition", "analysis", "synthesis"
+    degraded: bool = False  # rule-based fallback after an LLM call failed
+    kb_referenced: bool = False  # answer includes knowledge base code snippets
 
 
 @dataclass
@@ -36,6 +81,15 @@ class ReasoningResult:
     entities_consulted: List[CodeEntity]
     confidence: float
     answer_type: str
+    
+    def to_summary(self) -> Dict[str, Any]:
+        """Lightweight view without reasoning steps or entity objects."""
+        return {
+            "question": self.original_question,
+            "answer": self.final_answer,
+            "confidence": self.confidence,
+            "answer_type": self.answer_type,
+        }
 
 
 class ReasoningAgent:
@@ -58,8 +112,77 @@ class ReasoningAgent:
             os.environ["OPENAI_BASE_URL"] = self.config.llm_base_url
     
     def reason_about_question(self, question: str, entities: List[CodeEntity], 
-                            kb_results: List[str]) -> ReasoningResult:
-        """Perform multi-step reasoning about a question."""
+                            kb_results: List[str], bypass_cache: bool = False,
+                            on_chunk: Optional[Callable[[str], None]] = None) -> ReasoningResult:
+        """Perform multi-step reasoning about a question.
+        
+        Results are memoized on the normalized question, the model and the
+        supplied context; pass ``bypass_cache=True`` to force a fresh run.
+        Results that fell back to rule-based steps after an LLM error are not
+        memoized, so a later call can retry the LLM. The cache holds its own
+        copy of each result, so callers may modify what they get back.
+        When ``on_chunk`` is given, the final answer is passed to it as it is
+        generated.
+        """
+        context_key = self._context_cache_key(entities, kb_results)
+        cache_key = self._result_cache_key(question, context_key)
+        cached = None
+        if not bypass_cache:
+            with _CACHE_LOCK:
+                cached = _RESULT_CACHE.get(cache_key)
+        if cached is not None:
+            if on_chunk:
+                on_chunk(cached.final_answer)
+            return replace(copy.deepcopy(cached), original_question=question)
+        
+        result = self._reason_about_question(question, entities, kb_results, on_chunk,
+                                             context_key, bypass_cache)
+        if any(step.degraded for step in result.reasoning_steps):
+            return result
+        cached = copy.deepcopy(result)
+        with _CACHE_LOCK:
+            _RESULT_CACHE.put(cache_key, cached)
+        return result
+    
+    async def areason_about_question(self, question: str, entities: List[CodeEntity],
+                                     kb_results: List[str], bypass_cache: bool = False,
+                                     on_chunk: Optional[Callable[[str], None]] = None) -> ReasoningResult:
+        """Async variant of :meth:`reason_about_question`.
+        
+        The blocking LLM and analysis work runs in a worker thread, so several
+        questions can be awaited concurrently on one event loop.
+        """
+        return await asyncio.to_thread(
+            self.reason_about_question, question, entities, kb_results, bypass_cache, on_chunk
+        )
+    
+    def _context_cache_key(self, entities: List[CodeEntity], kb_results: List[str]) -> str:
+        """Hash the entities and KB snippets a question is answered from.
+        
+        Entity content is included, so re-indexed entities with the same ids
+        but changed code produce a different key.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for entity in entities:
+            digest.update(f"\0{entity.id}\0{entity.content}".encode("utf-8"))
+        for result in kb_results:
+            digest.update(f"\1{result}".encode("utf-8"))
+        return digest.hexdigest()
+    
+    def _result_cache_key(self, question: str, context_key: str) -> str:
+        """Build the memoization key for a reasoning request."""
+        normalized_question = " ".join(question.lower().split())
+        return hashlib.blake2b(
+            f"{self.config.llm_model}\n{self.llm_available}\n{normalized_question}\n{context_key}".encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+    
+    def _reason_about_question(self, question: str, entities: List[CodeEntity], 
+                               kb_results: List[str],
+                               on_chunk: Optional[Callable[[str], None]] = None,
+                               context_key: Optional[str] = None,
+                               bypass_cache: bool = False) -> ReasoningResult:
+        """Run decomposition, analysis and synthesis for a question."""
         reasoning_steps = []
         entities_consulted = []
         
@@ -69,17 +192,29 @@ class ReasoningAgent:
         
         # Step 2: Analyze each sub-question
         sub_questions = self._extract_sub_questions(decomposition_step.answer)
+        if context_key is None:
+            context_key = self._context_cache_key(entities, kb_results)
+        entities_by_name: Dict[str, List[CodeEntity]] = {}
+        for entity in entities:
+            entities_by_name.setdefault(entity.name, []).append(entity)
         for sub_q in sub_questions:
-            analysis_step = self._analyze_sub_question(sub_q, entities, kb_results)
+            analysis_key = (" ".join(sub_q.lower().split()), context_key)
+            analysis_step = None
+            if not bypass_cache:
+                with _CACHE_LOCK:
+                    analysis_step = _ANALYSIS_CACHE.get(analysis_key)
+            if analysis_step is None:
+                analysis_step = self._analyze_sub_question(sub_q, entities, kb_results)
+                with _CACHE_LOCK:
+                    _ANALYSIS_CACHE.put(analysis_key, analysis_step)
             reasoning_steps.append(analysis_step)
             
             # Track entities used
             for entity_name in analysis_step.entities_used:
-                matching_entities = [e for e in entities if e.name == entity_name]
-                entities_consulted.extend(matching_entities)
+                entities_consulted += entities_by_name.get(entity_name, _EMPTY_TUPLE)
         
         # Step 3: Synthesize comprehensive answer
-        synthesis_step = self._synthesize_answer(question, reasoning_steps, entities)
+        synthesis_step = self._synthesize_answer(question, reasoning_steps, entities, on_chunk)
         reasoning_steps.append(synthesis_step)
         
         # Calculate overall confidence
@@ -108,26 +243,21 @@ class ReasoningAgent:
         prompt = f"""Given this question about a codebase: "{question}"
 
 And these relevant code entities:
-{entity_context}
-
-Break down this question into 3-5 specific sub-questions that need to be answered to provide a comprehensive response. Focus on:
-1. Installation/setup procedures
-2. Configuration requirements
-3. Code examples and usage
-4. Troubleshooting common issues
-5. Best practices
-
-Return the sub-questions as a JSON array of strings."""
+{entity_context}"""
         
         try:
             response = litellm.completion(
                 model=self.config.llm_model,
-                messages=[{"role": "user", "content": prompt}],
+                messages=[
+                    {"role": "system", "content": _DECOMPOSITION_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
                 temperature=0.1
             )
             
-            sub_questions_json = response.choices[0].message.content
-            sub_questions = json.loads(sub_questions_json)
+            # Parse the first JSON array in the reply
+            content = response.choices[0].message.content
+            sub_questions, _ = _JSON_DECODER.raw_decode(content, content.index('['))
             
             return ReasoningStep(
                 question="How should I break down this question?",
@@ -138,7 +268,7 @@ Return the sub-questions as a JSON array of strings."""
             )
         except Exception as e:
             print(f"LLM decomposition failed: {e}")
-            return self._rule_based_decompose_question(question, entities)
+            return replace(self._rule_based_decompose_question(question, entities), degraded=True)
     
     def _rule_based_decompose_question(self, question: str, entities: List[CodeEntity]) -> ReasoningStep:
         """Rule-based question decomposition fallback."""
@@ -211,7 +341,8 @@ Return the sub-questions as a JSON array of strings."""
             answer=enhanced_answer,
             entities_used=[e.name for e in analyzed_answer.sources],
             confidence=analyzed_answer.confidence,
-            step_type="analysis"
+            step_type="analysis",
+            kb_referenced=enhanced_answer != analyzed_answer.answer
         )
     
     def _enhance_with_kb_results(self, base_answer: str, kb_results: List[str]) -> str:
@@ -225,51 +356,86 @@ Return the sub-questions as a JSON array of strings."""
                 relevant_snippets.append(result[:500])  # Truncate for readability
         
         if relevant_snippets:
-            enhanced = f"{base_answer}\n\n📖 **Relevant Code References:**\n"
-            for i, snippet in enumerate(relevant_snippets, 1):
-                enhanced += f"\n{i}. ```\n{snippet}\n```\n"
-            return enhanced
+            references = "".join(
+                f"\n{i}. ```\n{snippet}\n```\n"
+                for i, snippet in enumerate(relevant_snippets, 1)
+            )
+            return f"{base_answer}\n\n📖 **Relevant Code References:**\n{references}"
         
         return base_answer
     
     def _synthesize_answer(self, original_question: str, reasoning_steps: List[ReasoningStep], 
-                         entities: List[CodeEntity]) -> ReasoningStep:
+                         entities: List[CodeEntity],
+                         on_chunk: Optional[Callable[[str], None]] = None) -> ReasoningStep:
         """Synthesize a comprehensive final answer."""
-        if self.llm_available:
-            return self._llm_synthesize_answer(original_question, reasoning_steps, entities)
-        else:
-            return self._rule_based_synthesize_answer(original_question, reasoning_steps, entities)
+        # Skip the LLM round-trip when no analysis step found any sources or
+        # code snippets; it would only restate the empty findings
+        has_findings = any(
+            step.entities_used or step.kb_referenced
+            for step in reasoning_steps if step.step_type == "analysis"
+        )
+        if self.llm_available and has_findings:
+            return self._llm_synthesize_answer(original_question, reasoning_steps, entities, on_chunk)
+        
+        synthesis_step = self._rule_based_synthesize_answer(original_question, reasoning_steps, entities)
+        if on_chunk:
+            on_chunk(synthesis_step.answer)
+        return synthesis_step
     
     def _llm_synthesize_answer(self, original_question: str, reasoning_steps: List[ReasoningStep], 
-                             entities: List[CodeEntity]) -> ReasoningStep:
+                             entities: List[CodeEntity],
+                             on_chunk: Optional[Callable[[str], None]] = None) -> ReasoningStep:
         """Use LLM to synthesize comprehensive answer."""
-        analysis_context = "\n\n".join([
-            f"Q: {step.question}\nA: {step.answer}"
-            for step in reasoning_steps if step.step_type == "analysis"
-        ])
+        # Sub-questions often resolve to the same analyzer answer; send each
+        # distinct answer only once
+        seen_answers = set()
+        analysis_parts = []
+        # Bound each answer so one long step can't dominate the prompt
+        max_chars = self.config.llm_max_step_chars
+        for step in reasoning_steps:
+            if step.step_type != "analysis":
+                continue
+            normalized_answer = " ".join(step.answer.lower().split())
+            if normalized_answer in seen_answers:
+                continue
+            seen_answers.add(normalized_answer)
+            answer = step.answer
+            if len(answer) > max_chars:
+                answer = answer[:max_chars] + "…"
+            analysis_parts.append(f"Q: {step.question}\nA: {answer}")
+        analysis_context = "\n\n".join(analysis_parts)
         
         prompt = f"""Original question: "{original_question}"
 
 Based on this analysis of the codebase:
-{analysis_context}
-
-Provide a comprehensive, detailed answer that includes:
-1. Step-by-step procedures (if applicable)
-2. Configuration details with examples
-3. Code snippets with context
-4. Common troubleshooting tips
-5. Best practices and recommendations
-
-Format the answer with clear sections and examples."""
+{analysis_context}"""
+        messages = [
+            {"role": "system", "content": _SYNTHESIS_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
         
+        chunks = []
         try:
-            response = litellm.completion(
-                model=self.config.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
-            
-            synthesized_answer = response.choices[0].message.content
+            if on_chunk:
+                # Stream the answer so callers can show it while it is generated
+                for chunk in completion_with_retries(
+                    model=self.config.llm_model,
+                    messages=messages,
+                    temperature=0.2,
+                    stream=True
+                ):
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        chunks.append(delta)
+                        on_chunk(delta)
+                synthesized_answer = "".join(chunks)
+            else:
+                response = completion_with_retries(
+                    model=self.config.llm_model,
+                    messages=messages,
+                    temperature=0.2
+                )
+                synthesized_answer = response.choices[0].message.content
             
             return ReasoningStep(
                 question=original_question,
@@ -280,15 +446,23 @@ Format the answer with clear sections and examples."""
             )
         except Exception as e:
             print(f"LLM synthesis failed: {e}")
-            return self._rule_based_synthesize_answer(original_question, reasoning_steps, entities)
+            synthesis_step = replace(
+                self._rule_based_synthesize_answer(original_question, reasoning_steps, entities),
+                degraded=True
+            )
+            if on_chunk:
+                if chunks:
+                    # Part of the LLM answer was already shown; mark where the
+                    # fallback starts instead of running the two together
+                    on_chunk("\n\n⚠️  Answer stream interrupted; showing the rule-based answer instead:\n\n")
+                on_chunk(synthesis_step.answer)
+            return synthesis_step
     
     def _rule_based_synthesize_answer(self, original_question: str, reasoning_steps: List[ReasoningStep], 
                                     entities: List[CodeEntity]) -> ReasoningStep:
         """Rule-based answer synthesis fallback."""
         analysis_steps = [step for step in reasoning_steps if step.step_type == "analysis"]
         
-        synthesized_answer = f"## {original_question}\n\n"
-        
         # Group answers by type
         setup_answers = []
         usage_answers = []
@@ -296,35 +470,31 @@ Format the answer with clear sections and examples."""
         other_answers = []
         
         for step in analysis_steps:
-            if any(word in step.question.lower() for word in ['install', 'setup', 'configure']):
+            step_question = step.question.lower()
+            if any(word in step_question for word in ['install', 'setup', 'configure']):
                 setup_answers.append(step.answer)
-            elif any(word in step.question.lower() for word in ['usage', 'example', 'how']):
+            elif any(word in step_question for word in ['usage', 'example', 'how']):
                 usage_answers.append(step.answer)
-            elif any(word in step.question.lower() for word in ['error', 'issue', 'problem']):
+            elif any(word in step_question for word in ['error', 'issue', 'problem']):
                 troubleshooting_answers.append(step.answer)
             else:
                 other_answers.append(step.answer)
         
         # Build comprehensive answer
-        if setup_answers:
-            synthesized_answer += "### 🚀 Setup and Installation\n"
-            synthesized_answer += "\n".join(setup_answers) + "\n\n"
-        
-        if usage_answers:
-            synthesized_answer += "### 💡 Usage and Examples\n"
-            synthesized_answer += "\n".join(usage_answers) + "\n\n"
-        
-        if troubleshooting_answers:
-            synthesized_answer += "### 🔧 Troubleshooting\n"
-            synthesized_answer += "\n".join(troubleshooting_answers) + "\n\n"
-        
-        if other_answers:
-            synthesized_answer += "### 📚 Additional Information\n"
-            synthesized_answer += "\n".join(other_answers) + "\n\n"
+        parts = [f"## {original_question}\n\n"]
+        for heading, answers in (
+            ("### 🚀 Setup and Installation", setup_answers),
+            ("### 💡 Usage and Examples", usage_answers),
+            ("### 🔧 Troubleshooting", troubleshooting_answers),
+            ("### 📚 Additional Information", other_answers),
+        ):
+            if answers:
+                parts.append(f"{heading}\n")
+                parts.append("\n".join(answers) + "\n\n")
         
         return ReasoningStep(
             question=original_question,
-            answer=synthesized_answer,
+            answer="".join(parts),
             entities_used=[e.name for e in entities[:10]],
             confidence=0.7,
             step_type="synthesis"
@@ -1,12 +1,16 @@
 """Sense-then-act exploration strategy for CodeFusion."""
 
 import os
+import re
 import json
+import hashlib
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from pathlib import Path
 import time
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 
 try:
     import litellm
@@ -16,10 +20,105 @@ except ImportError:
 
 from ..kb.knowledge_base import CodeEntity, CodeKB
 from ..config import CfConfig
+from ..cache import LruCache
 from ..aci.system_access import SystemAccess
 
 
-@dataclass
+# Single-pass scanner for the structural patterns counted per file
+_FILE_PATTERN_RE = re.compile(
+    r'^(?P<classes>[ \t]*class )'
+    r'|^(?P<functions>[ \t]*def )'
+    r'|^(?P<imports>[ \t]*(?:import |from ))'
+    r'|^(?P<comments>[ \t]*#)'
+    r'|(?P<docstrings>""")',
+    re.MULTILINE
+)
+
+# Framework names detected in entity content, matched in a single scan
+_FRAMEWORK_RE = re.compile(r'pytest|unittest|fastapi|django')
+
+# Configuration file extensions looked for in entity names
+_CONFIG_EXT_RE = re.compile(r'\.(?:ini|ya?ml|json|toml)', re.IGNORECASE)
+
+# Question keywords mapped to the focus area they select
+_KEYWORD_FOCUS = {
+    "test": "testing_infrastructure",
+    "config": "configuration_setup",
+    "setup": "configuration_setup",
+    "install": "configuration_setup",
+    "api": "api_structure",
+    "endpoint": "api_structure",
+    "route": "api_structure",
+    "database": "data_layer",
+    "db": "data_layer",
+    "model": "data_layer",
+    "deploy": "deployment_setup",
+    "production": "deployment_setup"
+}
+# Matched inside a lookahead so overlapping keywords ("apinstall") are all found
+_FOCUS_KEYWORD_RE = re.compile("(?=(%s))" % "|".join(_KEYWORD_FOCUS))
+
+# File extension to language name
+_EXTENSION_LANGUAGES = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".java": "java",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".rs": "rust",
+    ".go": "go",
+    ".rb": "ruby",
+    ".php": "php",
+    ".md": "markdown",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+    ".json": "json",
+    ".xml": "xml",
+    ".html": "html",
+    ".css": "css"
+}
+
+# System prompt for answer synthesis
+_SYNTHESIS_SYSTEM_PROMPT = """You answer questions about a codebase from the results of a systematic exploration of it. Provide a comprehensive answer to the question.
+Include specific examples, step-by-step procedures, and actionable recommendations."""
+
+# Synthesized answers keyed by a hash of the full request, evicted LRU-first
+_LLM_CACHE_SIZE = 256
+_LLM_RESPONSE_CACHE = LruCache(_LLM_CACHE_SIZE)
+
+# File under the knowledge base directory that persists the cache above, so
+# repeated questions are answered without an LLM call in later runs
+_LLM_CACHE_FILE = "sense_act_llm_cache.json"
+
+# Finding keywords and the insight they produce, checked in order
+_INSIGHT_PREFIXES = (
+    ("patterns", "Code organization insight"),
+    ("frameworks", "Technology stack insight"),
+    ("files", "Project structure insight")
+)
+
+# Knowledge base search term used for each focus area
+_FOCUS_SEARCH_TERMS = {
+    "testing_infrastructure": "test",
+    "configuration_setup": "config",
+    "api_structure": "api",
+    "data_layer": "model",
+    "deployment_setup": "deploy",
+    "project_overview": ""
+}
+
+# Focus areas in order of precedence when a question matches several
+_FOCUS_PRIORITY = [
+    "testing_infrastructure",
+    "configuration_setup",
+    "api_structure",
+    "data_layer",
+    "deployment_setup"
+]
+
+
+@dataclass(slots=True)
 class SenseResult:
     """Result of sensing the environment."""
     timestamp: float
@@ -30,7 +129,7 @@ class SenseResult:
     next_actions: List[str]
 
 
-@dataclass
+@dataclass(slots=True)
 class ActionResult:
     """Result of taking an action."""
     action_type: str
@@ -42,7 +141,7 @@ class ActionResult:
     execution_time: float
 
 
-@dataclass
+@dataclass(slots=True)
 class SenseActCycle:
     """Single sense-act cycle."""
     cycle_id: int
@@ -52,7 +151,7 @@ class SenseActCycle:
     next_focus: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ExplorationSession:
     """Complete exploration session."""
     question: str
@@ -61,24 +160,68 @@ class ExplorationSession:
     key_insights: List[str]
     final_answer: str
     success_rate: float
+    
+    def to_summary(self) -> Dict[str, Any]:
+        """Lightweight view without cycles or entity objects."""
+        return {
+            "question": self.question,
+            "answer": self.final_answer,
+            "key_insights": list(self.key_insights),
+            "success_rate": self.success_rate,
+        }
 
 
 class SenseThenActAgent:
     """Agent that senses environment then acts iteratively."""
     
-    def __init__(self, config: CfConfig, kb: CodeKB):
+    def __init__(self, config: CfConfig, kb: CodeKB,
+                 system_access: Optional[SystemAccess] = None):
         self.config = config
         self.kb = kb
-        self.system_access = SystemAccess()
+        self.system_access = system_access or SystemAccess()
         self.llm_available = LITELLM_AVAILABLE and self.system_access.has_llm_config()
         
         # Internal state
         self.current_focus = ""
         self.explored_areas = set()
         self.accumulated_knowledge = []
+        self._focus_entities: Optional[Dict[str, List[CodeEntity]]] = None
+        
+        # Worker threads used to read candidate files during sensing
+        self.max_file_workers = 8
+        
+        self._llm_cache_path = Path(self.config.kb_path) / _LLM_CACHE_FILE
         
         if self.llm_available:
             self._setup_llm()
+            self._load_llm_cache()
+    
+    def _load_llm_cache(self):
+        """Seed the synthesized-answer cache from disk."""
+        if not self._llm_cache_path.exists():
+            return
+        try:
+            with open(self._llm_cache_path, 'r', encoding='utf-8') as f:
+                persisted = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read LLM cache {self._llm_cache_path}: {e}")
+            return
+        for cache_key, answer in persisted.items():
+            if cache_key not in _LLM_RESPONSE_CACHE:
+                _LLM_RESPONSE_CACHE.put(cache_key, answer)
+    
+    def _save_llm_cache(self):
+        """Write the synthesized-answer cache through to disk."""
+        # Write beside the target and swap it in, so an interrupted write
+        # never leaves a truncated cache that fails to load next run
+        tmp_path = self._llm_cache_path.with_suffix(".json.tmp")
+        try:
+            self._llm_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(_LLM_RESPONSE_CACHE.items()), f, ensure_ascii=False)
+            tmp_path.replace(self._llm_cache_path)
+        except OSError as e:
+            print(f"⚠️  Could not write LLM cache {self._llm_cache_path}: {e}")
     
     def _setup_llm(self):
         """Setup LLM configuration."""
@@ -97,8 +240,16 @@ class SenseThenActAgent:
         print()
         
         cycles = []
-        total_entities = []
-        key_insights = []
+        # Keyed by entity location / insight text so overlapping cycles don't
+        # duplicate; file entity ids are basename-only, so same-named files in
+        # different directories must not share a key
+        total_entities: Dict[Tuple[str, str, str], CodeEntity] = {}
+        key_insights: Dict[str, None] = {}
+        stale_cycles = 0  # consecutive cycles that added no new insights
+        
+        # Focus-area searches are reused across cycles of this exploration
+        # only, since the KB may be re-indexed between explorations
+        self._focus_entities = None
         
         # Initialize focus based on question
         self.current_focus = self._determine_initial_focus(question)
@@ -127,8 +278,12 @@ class SenseThenActAgent:
             )
             
             cycles.append(cycle)
-            total_entities.extend(action_result.new_entities)
-            key_insights.extend(action_result.insights)
+            total_entities.update(
+                ((entity.path, entity.type, entity.name), entity) for entity in action_result.new_entities
+            )
+            insight_count = len(key_insights)
+            key_insights.update(dict.fromkeys(action_result.insights))
+            stale_cycles = stale_cycles + 1 if len(key_insights) == insight_count else 0
             
             # Update state
             self.current_focus = next_focus
@@ -138,13 +293,16 @@ class SenseThenActAgent:
             print(f"   ✅ Found {len(action_result.new_entities)} entities, {len(action_result.insights)} insights")
             
             # Check if we should continue
-            if self._should_stop_exploration(cycle, question):
+            if self._should_stop_exploration(cycle, question, stale_cycles):
                 print(f"   ⏹️  Stopping exploration - sufficient information gathered")
                 break
             
             print(f"   ➡️  Next focus: {next_focus}")
             print()
         
+        total_entities = list(total_entities.values())
+        key_insights = list(key_insights)
+        
         # Generate final answer
         final_answer = self._synthesize_final_answer(question, cycles, total_entities, key_insights)
         
@@ -161,20 +319,13 @@ class SenseThenActAgent:
     
     def _determine_initial_focus(self, question: str) -> str:
         """Determine initial focus area based on question."""
-        question_lower = question.lower()
-        
-        if any(word in question_lower for word in ['test', 'testing']):
-            return "testing_infrastructure"
-        elif any(word in question_lower for word in ['config', 'setup', 'install']):
-            return "configuration_setup"
-        elif any(word in question_lower for word in ['api', 'endpoint', 'route']):
-            return "api_structure"
-        elif any(word in question_lower for word in ['database', 'db', 'model']):
-            return "data_layer"
-        elif any(word in question_lower for word in ['deploy', 'production']):
-            return "deployment_setup"
-        else:
-            return "project_overview"
+        matched = {_KEYWORD_FOCUS[keyword] for keyword in _FOCUS_KEYWORD_RE.findall(question.lower())}
+        
+        for focus_area in _FOCUS_PRIORITY:
+            if focus_area in matched:
+                return focus_area
+        
+        return "project_overview"
     
     def _sense_environment(self, question: str, repo_path: str, focus_area: str) -> SenseResult:
         """Sense the current environment and gather observations."""
@@ -263,77 +414,68 @@ class SenseThenActAgent:
             }
             
             patterns = focus_files.get(focus_area, [])
+            file_paths = [
+                file_path
+                for pattern in patterns
+                for file_path in repo_path.glob(f"**/{pattern}")
+                if file_path.is_file()
+            ]
             
-            for pattern in patterns:
-                for file_path in repo_path.glob(f"**/{pattern}"):
-                    if file_path.is_file():
-                        observations.append(f"Found {focus_area} file: {file_path.name}")
-                        
-                        # Create entity if not too large
-                        if file_path.stat().st_size < 100000:  # 100KB limit
-                            try:
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                    
-                                entity = CodeEntity(
-                                    id=f"file_{file_path.name}",
-                                    name=file_path.name,
-                                    type="file",
-                                    path=str(file_path),
-                                    content=content,
-                                    language=self._detect_language(file_path),
-                                    size=len(content),
-                                    created_at=datetime.now(),
-                                    metadata={"focus_area": focus_area}
-                                )
-                                entities.append(entity)
-                            except Exception:
-                                continue
+            for file_path in file_paths:
+                observations.append(f"Found {focus_area} file: {file_path.name}")
+            
+            # File reads are I/O bound, so overlap them across a small pool
+            created_at = datetime.now()
+            with ThreadPoolExecutor(max_workers=self.max_file_workers) as executor:
+                built = executor.map(
+                    lambda path: self._build_entity(path, focus_area, created_at), file_paths
+                )
+                entities = [entity for entity in built if entity is not None]
         
         except Exception as e:
             observations.append(f"Error observing files: {e}")
         
         return observations, entities
     
+    def _build_entity(self, file_path: Path, focus_area: str,
+                      created_at: datetime) -> Optional[CodeEntity]:
+        """Read a file and build its entity, or None if too large or unreadable."""
+        try:
+            if file_path.stat().st_size >= 100000:  # 100KB limit
+                return None
+            
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            
+            return CodeEntity(
+                id=f"file_{file_path.name}",
+                name=file_path.name,
+                type="file",
+                path=str(file_path),
+                content=content,
+                language=self._detect_language(file_path),
+                size=len(content),
+                created_at=created_at,
+                metadata={"focus_area": focus_area}
+            )
+        except Exception:
+            return None
+    
     def _detect_language(self, file_path: Path) -> str:
         """Detect programming language from file extension."""
-        extension_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".java": "java",
-            ".cpp": "cpp",
-            ".c": "c",
-            ".rs": "rust",
-            ".go": "go",
-            ".rb": "ruby",
-            ".php": "php",
-            ".md": "markdown",
-            ".yml": "yaml",
-            ".yaml": "yaml",
-            ".json": "json",
-            ".xml": "xml",
-            ".html": "html",
-            ".css": "css"
-        }
-        
-        return extension_map.get(file_path.suffix.lower(), "unknown")
+        return _EXTENSION_LANGUAGES.get(file_path.suffix.lower(), "unknown")
     
     def _query_kb_for_focus(self, focus_area: str) -> List[CodeEntity]:
         """Query knowledge base for entities related to focus area."""
         try:
-            # Search for entities related to focus area
-            search_terms = {
-                "testing_infrastructure": "test",
-                "configuration_setup": "config",
-                "api_structure": "api",
-                "data_layer": "model",
-                "deployment_setup": "deploy",
-                "project_overview": ""
-            }
+            # All focus areas are searched together the first time any is needed
+            if self._focus_entities is None:
+                self._focus_entities = self.kb.search_entities_batch(
+                    list(_FOCUS_SEARCH_TERMS.values()), limit=10
+                )
             
-            search_term = search_terms.get(focus_area, "")
-            return self.kb.search_entities(search_term, limit=10)
+            search_term = _FOCUS_SEARCH_TERMS.get(focus_area, "")
+            return self._focus_entities.get(search_term, [])
             
         except Exception:
             return []
@@ -427,16 +569,12 @@ class SenseThenActAgent:
     
     def _analyze_file_for_patterns(self, entity: CodeEntity) -> str:
         """Analyze a file for patterns."""
-        content = entity.content
-        lines = content.split('\n')
-        
-        patterns = {
-            "classes": len([line for line in lines if line.strip().startswith('class ')]),
-            "functions": len([line for line in lines if line.strip().startswith('def ')]),
-            "imports": len([line for line in lines if line.strip().startswith('import ') or line.strip().startswith('from ')]),
-            "comments": len([line for line in lines if line.strip().startswith('#')]),
-            "docstrings": content.count('"""') // 2
-        }
+        patterns = {"classes": 0, "functions": 0, "imports": 0, "comments": 0, "docstrings": 0}
+        
+        for match in _FILE_PATTERN_RE.finditer(entity.content):
+            patterns[match.lastgroup] += 1
+        
+        patterns["docstrings"] //= 2
         
         return f"File {entity.name} patterns: {patterns}"
     
@@ -454,33 +592,24 @@ class SenseThenActAgent:
         frameworks = set()
         
         for entity in entities:
-            if "pytest" in entity.content:
-                frameworks.add("pytest")
-            if "unittest" in entity.content:
-                frameworks.add("unittest")
-            if "fastapi" in entity.content:
-                frameworks.add("fastapi")
-            if "django" in entity.content:
-                frameworks.add("django")
+            frameworks.update(_FRAMEWORK_RE.findall(entity.content))
         
         return [f"Detected frameworks: {', '.join(frameworks)}"]
     
     def _parse_configuration_files(self, entities: List[CodeEntity]) -> List[str]:
         """Parse configuration files."""
-        config_files = [e for e in entities if any(ext in e.name.lower() for ext in ['.ini', '.yaml', '.yml', '.json', '.toml'])]
-        return [f"Found {len(config_files)} configuration files"]
+        config_count = sum(1 for e in entities if _CONFIG_EXT_RE.search(e.name))
+        return [f"Found {config_count} configuration files"]
     
     def _generate_insights(self, findings: List[str], focus_area: str) -> List[str]:
         """Generate insights from findings."""
         insights = []
         
         for finding in findings:
-            if "patterns" in finding:
-                insights.append(f"Code organization insight: {finding}")
-            elif "frameworks" in finding:
-                insights.append(f"Technology stack insight: {finding}")
-            elif "files" in finding:
-                insights.append(f"Project structure insight: {finding}")
+            for keyword, prefix in _INSIGHT_PREFIXES:
+                if keyword in finding:
+                    insights.append(f"{prefix}: {finding}")
+                    break
         
         return insights
     
@@ -535,7 +664,8 @@ class SenseThenActAgent:
         # Default progression
         return "project_overview"
     
-    def _should_stop_exploration(self, cycle: SenseActCycle, question: str) -> bool:
+    def _should_stop_exploration(self, cycle: SenseActCycle, question: str,
+                                 stale_cycles: int = 0) -> bool:
         """Determine if exploration should stop."""
         # Stop if high confidence and successful action
         if (cycle.sense_result.confidence > 0.8 and 
@@ -543,6 +673,10 @@ class SenseThenActAgent:
             len(cycle.action_result.insights) > 2):
             return True
         
+        # Stop if recent cycles keep rediscovering the same insights
+        if stale_cycles >= 2:
+            return True
+        
         # Stop if we've explored enough areas
         if len(self.explored_areas) >= 4:
             return True
@@ -561,15 +695,15 @@ class SenseThenActAgent:
                              entities: List[CodeEntity], insights: List[str]) -> str:
         """Use LLM to synthesize final answer."""
         # Create context from cycles
-        cycle_context = "\n".join([
+        cycle_context = "\n".join(
             f"Cycle {cycle.cycle_id}: Explored {cycle.sense_result.focus_area}, "
             f"found {len(cycle.action_result.new_entities)} entities, "
             f"{len(cycle.action_result.insights)} insights"
             for cycle in cycles
-        ])
+        )
         
         # Create insights context
-        insights_context = "\n".join(insights[:10])
+        insights_context = "\n".join(islice(insights, 10))
         
         prompt = f"""Question: {question}
 
@@ -577,19 +711,33 @@ Exploration cycles:
 {cycle_context}
 
 Key insights:
-{insights_context}
-
-Based on this systematic exploration, provide a comprehensive answer to the question.
-Include specific examples, step-by-step procedures, and actionable recommendations."""
+{insights_context}"""
+        
+        request = {
+            "model": self.config.llm_model,
+            "messages": [
+                {"role": "system", "content": _SYNTHESIS_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.2
+        }
+        # Keyed on the whole request, so changing the instructions or call
+        # parameters doesn't serve answers persisted for the old ones
+        cache_key = hashlib.blake2b(
+            json.dumps(request, sort_keys=True).encode("utf-8"), digest_size=16
+        ).hexdigest()
+        cached = _LLM_RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            response = litellm.completion(
-                model=self.config.llm_model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.2
-            )
+            response = litellm.completion(**request)
+            
+            answer = response.choices[0].message.content
+            _LLM_RESPONSE_CACHE.put(cache_key, answer)
+            self._save_llm_cache()
             
-            return response.choices[0].message.content
+            return answer
         except Exception as e:
             return self._rule_based_synthesize_answer(question, cycles, entities, insights)
     
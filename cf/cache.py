@@ -0,0 +1,44 @@
+"""Bounded in-memory caches for CodeFusion."""
+
+from collections import OrderedDict
+from typing import Any, Hashable, Iterator, Optional, Tuple
+
+
+class LruCache:
+    """Mapping with a fixed capacity that evicts the least recently used entry.
+    
+    Not thread-safe; callers that share a cache across threads guard it with
+    their own lock.
+    """
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the value for key, marking it most recently used."""
+        if key not in self._entries:
+            return default
+        self._entries.move_to_end(key)
+        return self._entries[key]
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the oldest entries beyond maxsize."""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def items(self) -> Iterator[Tuple[Hashable, Any]]:
+        """Iterate over entries from least to most recently used."""
+        return iter(self._entries.items())
+    
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
@@ -6,10 +6,25 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, field
 
+# libyaml's C loader and dumper when PyYAML was built with it, else the pure-Python ones
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 @dataclass
 class CfConfig:
-    """Configuration class for CodeFusion that loads from YAML/JSON files."""
+    """Configuration class for CodeFusion that loads from YAML/JSON files.
+    
+    JSON files load fastest, especially with the optional orjson parser.
+    """
     
     # Core settings
     repo_path: Optional[str] = None
@@ -19,6 +34,7 @@ class CfConfig:
     llm_model: str = "gpt-3.5-turbo"
     llm_api_key: Optional[str] = None
     llm_base_url: Optional[str] = None
+    llm_max_step_chars: int = 1000  # Per-step answer budget in synthesis prompts
     
     # Knowledge base settings
     kb_type: str = "text"  # "text", "neo4j", or "vector"
@@ -27,6 +43,9 @@ class CfConfig:
     neo4j_user: Optional[str] = None
     neo4j_password: Optional[str] = None
     embedding_model: str = "all-MiniLM-L6-v2"
+    vector_index_type: str = "flat"  # "flat" or "hnsw"
+    quantize_embeddings: bool = False  # int8 embedding model on CPU
+    embedding_dtype: str = "float32"  # "float32" or "float16" for stored embeddings
     
     # Indexing settings
     max_file_size: int = 1024 * 1024  # 1MB
@@ -36,6 +55,7 @@ class CfConfig:
     excluded_extensions: list = field(default_factory=lambda: [
         ".pyc", ".pyo", ".pyd", ".so", ".dll", ".exe", ".env"
     ])
+    relationship_similarity_threshold: float = 0.7  # Min name similarity for "similar" relationships
     
     # Exploration settings
     exploration_strategy: str = "react"  # "react", "plan_act", "sense_act"
@@ -49,13 +69,18 @@ class CfConfig:
         if not path.exists():
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
         
-        with open(path, 'r', encoding='utf-8') as f:
-            if path.suffix.lower() in ['.yaml', '.yml']:
-                data = yaml.safe_load(f)
-            elif path.suffix.lower() == '.json':
-                data = json.load(f)
-            else:
-                raise ValueError(f"Unsupported configuration file format: {path.suffix}")
+        suffix = path.suffix.lower()
+        if suffix == '.json' and ORJSON_AVAILABLE:
+            with open(path, 'rb') as f:
+                data = orjson.loads(f.read())
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                if suffix in ['.yaml', '.yml']:
+                    data = yaml.load(f, Loader=_YamlLoader)
+                elif suffix == '.json':
+                    data = json.load(f)
+                else:
+                    raise ValueError(f"Unsupported configuration file format: {path.suffix}")
         
         # Load environment variables to override config
         config = cls(**data)
@@ -75,15 +100,20 @@ class CfConfig:
             "llm_model": self.llm_model,
             "llm_api_key": self.llm_api_key,
             "llm_base_url": self.llm_base_url,
+            "llm_max_step_chars": self.llm_max_step_chars,
             "kb_type": self.kb_type,
             "kb_path": self.kb_path,
             "neo4j_uri": self.neo4j_uri,
             "neo4j_user": self.neo4j_user,
             "neo4j_password": self.neo4j_password,
             "embedding_model": self.embedding_model,
+            "vector_index_type": self.vector_index_type,
+            "quantize_embeddings": self.quantize_embeddings,
+            "embedding_dtype": self.embedding_dtype,
             "max_file_size": self.max_file_size,
             "excluded_dirs": self.excluded_dirs,
             "excluded_extensions": self.excluded_extensions,
+            "relationship_similarity_threshold": self.relationship_similarity_threshold,
             "exploration_strategy": self.exploration_strategy,
             "max_exploration_depth": self.max_exploration_depth,
         }
@@ -95,7 +125,7 @@ class CfConfig:
         
         with open(path, 'w', encoding='utf-8') as f:
             if path.suffix.lower() in ['.yaml', '.yml']:
-                yaml.dump(data, f, default_flow_style=False, indent=2)
+                yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, indent=2)
             elif path.suffix.lower() == '.json':
                 json.dump(data, f, indent=2)
             else:
@@ -109,6 +139,12 @@ class CfConfig:
         if self.exploration_strategy not in ["react", "plan_act", "sense_act"]:
             raise ValueError(f"Invalid exploration_strategy: {self.exploration_strategy}")
         
+        if self.vector_index_type not in ["flat", "hnsw"]:
+            raise ValueError(f"Invalid vector_index_type: {self.vector_index_type}")
+        
+        if self.embedding_dtype not in ["float32", "float16"]:
+            raise ValueError(f"Invalid embedding_dtype: {self.embedding_dtype}")
+        
         if self.kb_type == "neo4j":
             if not all([self.neo4j_uri, self.neo4j_user, self.neo4j_password]):
                 raise ValueError("Neo4j configuration requires uri, user, and password")
@@ -118,6 +154,12 @@ class CfConfig:
         
         if self.max_file_size < 1:
             raise ValueError("max_file_size must be at least 1")
+        
+        if not 0.0 <= self.relationship_similarity_threshold <= 1.0:
+            raise ValueError("relationship_similarity_threshold must be between 0.0 and 1.0")
+        
+        if self.llm_max_step_chars < 1:
+            raise ValueError("llm_max_step_chars must be at least 1")
     
     def _load_env_overrides(self):
         """Load environment variable overrides."""
@@ -3,8 +3,9 @@
 import hashlib
 import re
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 import uuid
 
@@ -13,6 +14,13 @@ from ..kb.knowledge_base import CodeKB, CodeEntity, CodeRelationship
 from ..config import CfConfig
 
 
+# Declaration patterns applied to every stripped source line while indexing
+_CLASS_DEF_RE = re.compile(r'class\s+(\w+)')
+_PY_FUNCTION_DEF_RE = re.compile(r'def\s+(\w+)')
+_JS_FUNCTION_DEF_RE = re.compile(r'(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=)')
+_JS_IMPORT_FROM_RE = re.compile(r'import\s+.*?from\s+[\'"]([^\'"]+)[\'"]')
+
+
 class ExplorationStrategy(ABC):
     """Abstract base class for exploration strategies."""
     
@@ -30,6 +38,8 @@ class ReactExploration(ExplorationStrategy):
     
     def __init__(self):
         super().__init__("react")
+        # Worker threads used to read files ahead of processing
+        self.max_read_workers = 8
     
     def explore(self, repo: CodeRepo, kb: CodeKB, config: CfConfig) -> Dict[str, Any]:
         """Execute ReAct exploration."""
@@ -48,16 +58,21 @@ class ReactExploration(ExplorationStrategy):
             # Step 2: Act - Process high-priority files first
             priority_files = self._prioritize_files(repo, overview)
             
-            # Step 3: Iteratively explore and reason
-            for file_path in priority_files[:config.max_exploration_depth * 10]:
-                try:
-                    self._process_file(repo, kb, file_path)
-                    results["files_processed"] += 1
-                except Exception as e:
-                    results["errors"].append(f"Error processing {file_path}: {str(e)}")
+            # Step 3: Iteratively explore and reason. Files are read
+            # concurrently, but entities are added to the KB in priority order
+            files_to_process = priority_files[:config.max_exploration_depth * 10]
+            with ThreadPoolExecutor(max_workers=self.max_read_workers) as executor:
+                reads = [executor.submit(self._read_file, repo, file_path) for file_path in files_to_process]
+                for file_path, read in zip(files_to_process, reads):
+                    try:
+                        content, file_info = read.result()
+                        self._process_file(kb, file_path, content, file_info)
+                        results["files_processed"] += 1
+                    except Exception as e:
+                        results["errors"].append(f"Error processing {file_path}: {str(e)}")
             
             # Step 4: Create relationships between entities
-            self._create_relationships(kb)
+            self._create_relationships(kb, config)
             
             results["entities_created"] = len(kb._entities)
             results["relationships_created"] = len(kb._relationships)
@@ -87,35 +102,39 @@ class ReactExploration(ExplorationStrategy):
     
     def _prioritize_files(self, repo: CodeRepo, overview: Dict[str, Any]) -> List[str]:
         """Prioritize files for exploration based on reasoning."""
-        priority_files = []
+        # Walk the repository once and track queued paths in a set, rather
+        # than re-walking per extension and scanning the list for membership
+        files = [file_info for file_info in repo.walk_repository() if not file_info.is_directory]
         
         # Add important files first
-        priority_files.extend(overview["important_files"])
+        priority_files = list(overview["important_files"])
+        queued = set(priority_files)
         
         # Add configuration files
         config_patterns = ['config', 'settings', 'env', 'package.json', 'requirements.txt', 'setup.py']
-        for file_info in repo.walk_repository():
-            if not file_info.is_directory:
-                if any(pattern in file_info.path.lower() for pattern in config_patterns):
-                    if file_info.path not in priority_files:
-                        priority_files.append(file_info.path)
+        for file_info in files:
+            if any(pattern in file_info.path.lower() for pattern in config_patterns):
+                if file_info.path not in queued:
+                    queued.add(file_info.path)
+                    priority_files.append(file_info.path)
         
         # Add remaining files, prioritizing by extension
         priority_extensions = ['.py', '.js', '.ts', '.java', '.cpp', '.c', '.cs', '.go', '.rs']
         for ext in priority_extensions:
-            for file_info in repo.walk_repository():
-                if not file_info.is_directory and file_info.extension == ext:
-                    if file_info.path not in priority_files:
-                        priority_files.append(file_info.path)
+            for file_info in files:
+                if file_info.extension == ext and file_info.path not in queued:
+                    queued.add(file_info.path)
+                    priority_files.append(file_info.path)
         
         return priority_files
     
-    def _process_file(self, repo: CodeRepo, kb: CodeKB, file_path: str) -> None:
+    def _read_file(self, repo: CodeRepo, file_path: str) -> Tuple[str, FileInfo]:
+        """Read a file's content and info."""
+        return repo.read_file(file_path), repo.get_file_info(file_path)
+    
+    def _process_file(self, kb: CodeKB, file_path: str, content: str, file_info: FileInfo) -> None:
         """Process a single file and extract entities."""
         try:
-            content = repo.read_file(file_path)
-            file_info = repo.get_file_info(file_path)
-            
             # Create file entity
             file_entity = CodeEntity(
                 id=self._generate_id("file", file_path),
@@ -134,33 +153,39 @@ class ReactExploration(ExplorationStrategy):
                 }
             )
             
-            kb.add_entity(file_entity)
+            entities = [file_entity]
             
             # Extract code entities (classes, functions) if it's a code file
             if file_entity.language != "unknown":
-                self._extract_code_entities(content, file_path, file_entity.language, kb)
+                self._extract_code_entities(content, file_path, file_entity.language, entities)
+            
+            # Add the file's entities together so their embeddings are
+            # generated in one batch
+            kb.add_entities(entities)
                 
         except Exception as e:
             raise Exception(f"Failed to process file {file_path}: {str(e)}")
     
-    def _extract_code_entities(self, content: str, file_path: str, language: str, kb: CodeKB) -> None:
-        """Extract classes, functions, and other code entities."""
+    def _extract_code_entities(self, content: str, file_path: str, language: str,
+                               entities: List[CodeEntity]) -> None:
+        """Extract classes, functions, and other code entities into ``entities``."""
         lines = content.splitlines()
         
         if language == "python":
-            self._extract_python_entities(lines, file_path, content, kb)
+            self._extract_python_entities(lines, file_path, content, entities)
         elif language in ["javascript", "typescript"]:
-            self._extract_js_entities(lines, file_path, content, kb)
+            self._extract_js_entities(lines, file_path, content, entities)
         # Add more language support as needed
     
-    def _extract_python_entities(self, lines: List[str], file_path: str, content: str, kb: CodeKB) -> None:
+    def _extract_python_entities(self, lines: List[str], file_path: str, content: str,
+                                 entities: List[CodeEntity]) -> None:
         """Extract Python classes and functions."""
         for i, line in enumerate(lines):
             stripped = line.strip()
             
             # Extract classes
             if stripped.startswith("class "):
-                match = re.match(r'class\s+(\w+)', stripped)
+                match = _CLASS_DEF_RE.match(stripped)
                 if match:
                     class_name = match.group(1)
                     entity = CodeEntity(
@@ -174,11 +199,11 @@ class ReactExploration(ExplorationStrategy):
                         created_at=datetime.now(),
                         metadata={"line_number": i + 1, "file_path": file_path}
                     )
-                    kb.add_entity(entity)
+                    entities.append(entity)
             
             # Extract functions
             elif stripped.startswith("def "):
-                match = re.match(r'def\s+(\w+)', stripped)
+                match = _PY_FUNCTION_DEF_RE.match(stripped)
                 if match:
                     func_name = match.group(1)
                     entity = CodeEntity(
@@ -192,16 +217,17 @@ class ReactExploration(ExplorationStrategy):
                         created_at=datetime.now(),
                         metadata={"line_number": i + 1, "file_path": file_path}
                     )
-                    kb.add_entity(entity)
+                    entities.append(entity)
     
-    def _extract_js_entities(self, lines: List[str], file_path: str, content: str, kb: CodeKB) -> None:
+    def _extract_js_entities(self, lines: List[str], file_path: str, content: str,
+                             entities: List[CodeEntity]) -> None:
         """Extract JavaScript/TypeScript classes and functions."""
         for i, line in enumerate(lines):
             stripped = line.strip()
             
             # Extract classes
             if stripped.startswith("class "):
-                match = re.match(r'class\s+(\w+)', stripped)
+                match = _CLASS_DEF_RE.match(stripped)
                 if match:
                     class_name = match.group(1)
                     entity = CodeEntity(
@@ -215,11 +241,11 @@ class ReactExploration(ExplorationStrategy):
                         created_at=datetime.now(),
                         metadata={"line_number": i + 1, "file_path": file_path}
                     )
-                    kb.add_entity(entity)
+                    entities.append(entity)
             
             # Extract functions
             elif "function" in stripped or "=>" in stripped:
-                func_match = re.search(r'(?:function\s+(\w+)|(?:const|let|var)\s+(\w+)\s*=)', stripped)
+                func_match = _JS_FUNCTION_DEF_RE.search(stripped)
                 if func_match:
                     func_name = func_match.group(1) or func_match.group(2)
                     if func_name:
@@ -234,7 +260,7 @@ class ReactExploration(ExplorationStrategy):
                             created_at=datetime.now(),
                             metadata={"line_number": i + 1, "file_path": file_path}
                         )
-                        kb.add_entity(entity)
+                        entities.append(entity)
     
     def _extract_block(self, lines: List[str], start_line: int) -> str:
         """Extract a code block starting from the given line."""
@@ -255,7 +281,7 @@ class ReactExploration(ExplorationStrategy):
         
         return "\n".join(block_lines)
     
-    def _create_relationships(self, kb: CodeKB) -> None:
+    def _create_relationships(self, kb: CodeKB, config: CfConfig) -> None:
         """Create relationships between entities using advanced detection."""
         print("Detecting advanced relationships...")
         
@@ -263,7 +289,7 @@ class ReactExploration(ExplorationStrategy):
             from ..kb.relationship_detector import RelationshipDetector
             
             # Use advanced relationship detection
-            relationship_detector = RelationshipDetector()
+            relationship_detector = RelationshipDetector(config.relationship_similarity_threshold)
             relationships = relationship_detector.detect_relationships(kb._entities)
             
             # Add detected relationships to knowledge base
@@ -314,7 +340,7 @@ class ReactExploration(ExplorationStrategy):
             elif language in ["javascript", "typescript"]:
                 if "import" in line or "require(" in line:
                     # Extract import names (simplified)
-                    match = re.search(r'import\s+.*?from\s+[\'"]([^\'"]+)[\'"]', line)
+                    match = _JS_IMPORT_FROM_RE.search(line)
                     if match:
                         imports.append(match.group(1).split('/')[-1])
         
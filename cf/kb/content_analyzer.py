@@ -1,12 +1,73 @@
 """Content analyzer for extracting structured information from code repositories."""
 
 import re
+from functools import lru_cache
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 
 from ..kb.knowledge_base import CodeEntity
 
 
+# Question type keyword patterns, checked in order
+_QUESTION_TYPE_PATTERNS = {
+    'testing': [
+        r'test.*suite', r'run.*test', r'pytest', r'coverage', r'test.*report',
+        r'testing.*setup', r'test.*config', r'test.*dependencies'
+    ],
+    'setup': [
+        r'install', r'setup', r'getting.*started', r'requirements',
+        r'dependencies', r'environment', r'virtual.*env'
+    ],
+    'usage': [
+        r'how.*use', r'example', r'tutorial', r'getting.*started',
+        r'quick.*start', r'basic.*usage'
+    ],
+    'configuration': [
+        r'config', r'settings', r'environment.*var', r'configure'
+    ],
+    'deployment': [
+        r'deploy', r'production', r'docker', r'build', r'release'
+    ]
+}
+
+# Each question type's patterns compiled into one alternation, in the same order
+_QUESTION_TYPE_RES = {
+    question_type: re.compile('|'.join(type_patterns))
+    for question_type, type_patterns in _QUESTION_TYPE_PATTERNS.items()
+}
+
+# Command formats recognised in documentation: code blocks, inline code with
+# tools, shell prompt lines and simple command lines
+_COMMAND_RES = [
+    re.compile(pattern, re.MULTILINE | re.IGNORECASE)
+    for pattern in (
+        r'```(?:bash|shell|sh)\\n([^`]+)```',
+        r'`([^`]*(?:pip|python|pytest|npm|yarn)[^`]*)`',
+        r'^\\s*\\$\\s*(.+)$',
+        r'^\\s*([a-z-]+(?:\\s+[a-z0-9._-]+)+)\\s*$'
+    )
+]
+
+# Version specifier separating a requirement's package name from its version
+_VERSION_SPECIFIER_RE = re.compile(r'[>=<~!]')
+
+# Inline-code pip/python command in an installation section
+_INLINE_INSTALL_COMMAND_RE = re.compile(r'`([^`]*(?:pip|python)[^`]*)`')
+
+# Python code blocks in documentation
+_PYTHON_CODE_BLOCK_RE = re.compile(r'```(?:python|py)?\\n([^`]+)```', re.DOTALL)
+
+
+@lru_cache(maxsize=1024)
+def _classify_question_text(question_lower: str) -> str:
+    """Classify a lowercased question; repeated sub-questions hit the cache."""
+    for question_type, type_re in _QUESTION_TYPE_RES.items():
+        if type_re.search(question_lower):
+            return question_type
+    
+    return 'general'
+
+
 @dataclass
 class AnalyzedAnswer:
     """Structured answer with analysis details."""
@@ -43,35 +104,7 @@ class ContentAnalyzer:
     
     def _classify_question(self, question: str) -> str:
         """Classify the question type based on keywords."""
-        question_lower = question.lower()
-        
-        patterns = {
-            'testing': [
-                r'test.*suite', r'run.*test', r'pytest', r'coverage', r'test.*report',
-                r'testing.*setup', r'test.*config', r'test.*dependencies'
-            ],
-            'setup': [
-                r'install', r'setup', r'getting.*started', r'requirements',
-                r'dependencies', r'environment', r'virtual.*env'
-            ],
-            'usage': [
-                r'how.*use', r'example', r'tutorial', r'getting.*started',
-                r'quick.*start', r'basic.*usage'
-            ],
-            'configuration': [
-                r'config', r'settings', r'environment.*var', r'configure'
-            ],
-            'deployment': [
-                r'deploy', r'production', r'docker', r'build', r'release'
-            ]
-        }
-        
-        for question_type, type_patterns in patterns.items():
-            for pattern in type_patterns:
-                if re.search(pattern, question_lower):
-                    return question_type
-        
-        return 'general'
+        return _classify_question_text(question.lower())
     
     def _analyze_testing_question(self, question: str, entities: List[CodeEntity]) -> AnalyzedAnswer:
         """Analyze testing-related questions."""
@@ -301,16 +334,8 @@ class ContentAnalyzer:
         """Extract command-line commands from content."""
         commands = []
         
-        # Patterns for different command formats
-        patterns = [
-            r'```(?:bash|shell|sh)\\n([^`]+)```',  # Code blocks
-            r'`([^`]*(?:pip|python|pytest|npm|yarn)[^`]*)`',  # Inline code with tools
-            r'^\\s*\\$\\s*(.+)$',  # Shell prompt lines
-            r'^\\s*([a-z-]+(?:\\s+[a-z0-9._-]+)+)\\s*$'  # Simple command lines
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.MULTILINE | re.IGNORECASE)
+        for command_re in _COMMAND_RES:
+            matches = command_re.findall(content)
             for match in matches:
                 if isinstance(match, tuple):
                     match = match[0] if match else ""
@@ -329,7 +354,7 @@ class ContentAnalyzer:
             line = line.strip()
             if line and not line.startswith('#') and not line.startswith('-'):
                 # Extract package name (before version specifiers)
-                pkg = re.split(r'[>=<~!]', line)[0].strip()
+                pkg = _VERSION_SPECIFIER_RE.split(line)[0].strip()
                 if pkg:
                     deps.append(pkg)
         return deps
@@ -375,7 +400,7 @@ class ContentAnalyzer:
                     instructions.append(line.strip())
                 elif '`pip ' in line or '`python ' in line:
                     # Extract from inline code
-                    cmd_match = re.search(r'`([^`]*(?:pip|python)[^`]*)`', line)
+                    cmd_match = _INLINE_INSTALL_COMMAND_RE.search(line)
                     if cmd_match:
                         instructions.append(cmd_match.group(1))
         
@@ -386,8 +411,7 @@ class ContentAnalyzer:
         examples = []
         
         # Look for code blocks
-        code_block_pattern = r'```(?:python|py)?\\n([^`]+)```'
-        matches = re.findall(code_block_pattern, content, re.DOTALL)
+        matches = _PYTHON_CODE_BLOCK_RE.findall(content)
         
         for match in matches:
             if len(match.strip()) > 20 and len(match.strip()) < 500:  # Reasonable example size
@@ -1,13 +1,21 @@
 """Code Knowledge Base implementation for CodeFusion."""
 
 import json
+import heapq
 import pickle
+from collections import Counter
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 @dataclass
 class CodeEntity:
@@ -58,6 +66,11 @@ class CodeKB(ABC):
         """Add a code entity to the knowledge base."""
         pass
     
+    def add_entities(self, entities: List[CodeEntity]) -> None:
+        """Add several code entities to the knowledge base."""
+        for entity in entities:
+            self.add_entity(entity)
+    
     @abstractmethod
     def add_relationship(self, relationship: CodeRelationship) -> None:
         """Add a relationship between entities."""
@@ -73,6 +86,31 @@ class CodeKB(ABC):
         """Search for entities matching the query."""
         pass
     
+    def search_entities_batch(self, queries: List[str], limit: Optional[int] = None,
+                              entity_type: Optional[str] = None) -> Dict[str, List[CodeEntity]]:
+        """Search for several queries at once, returning matches keyed by query."""
+        return {
+            query: self.search_entities(query, entity_type)[:limit]
+            for query in dict.fromkeys(queries)
+        }
+    
+    def _write_json(self, path: Path, data: Any) -> None:
+        """Write JSON to disk, using orjson when it is installed."""
+        if ORJSON_AVAILABLE:
+            with open(path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+    
+    def _read_json(self, path: Path) -> Any:
+        """Read JSON from disk, using orjson when it is installed."""
+        if ORJSON_AVAILABLE:
+            with open(path, 'rb') as f:
+                return orjson.loads(f.read())
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     @abstractmethod
     def get_related_entities(self, entity_id: str, relationship_type: Optional[str] = None) -> List[Tuple[CodeEntity, CodeRelationship]]:
         """Get entities related to the given entity."""
@@ -121,14 +159,9 @@ class CodeKB(ABC):
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get knowledge base statistics."""
-        entity_types = {}
-        relationship_types = {}
-        
-        for entity in self._entities.values():
-            entity_types[entity.type] = entity_types.get(entity.type, 0) + 1
-        
-        for rel in self._relationships.values():
-            relationship_types[rel.relationship_type] = relationship_types.get(rel.relationship_type, 0) + 1
+        # Counter tallies in C rather than with a per-item dict update
+        entity_types = dict(Counter(entity.type for entity in self._entities.values()))
+        relationship_types = dict(Counter(rel.relationship_type for rel in self._relationships.values()))
         
         return {
             "total_entities": len(self._entities),
@@ -181,6 +214,33 @@ class TextBasedKB(CodeKB):
         
         return results
     
+    def search_entities_batch(self, queries: List[str], limit: Optional[int] = None,
+                              entity_type: Optional[str] = None) -> Dict[str, List[CodeEntity]]:
+        """Search for several queries in a single pass over the entities."""
+        results = {query: [] for query in queries}
+        pending = {query: query.lower() for query in results}
+        
+        for entity in self._entities.values():
+            if not pending:
+                break
+            
+            # Filter by type if specified
+            if entity_type and entity.type != entity_type:
+                continue
+            
+            # Lowercased once per entity and shared by all pending queries
+            name_lower, path_lower, content_lower = entity.name.lower(), entity.path.lower(), entity.content.lower()
+            
+            for query, query_lower in list(pending.items()):
+                if (query_lower in name_lower or
+                    query_lower in path_lower or
+                    query_lower in content_lower):
+                    results[query].append(entity)
+                    if limit is not None and len(results[query]) >= limit:
+                        del pending[query]
+        
+        return results
+    
     def get_related_entities(self, entity_id: str, relationship_type: Optional[str] = None) -> List[Tuple[CodeEntity, CodeRelationship]]:
         """Get entities related to the given entity."""
         results = []
@@ -208,16 +268,14 @@ class TextBasedKB(CodeKB):
             entity_dict['created_at'] = entity.created_at.isoformat()
             entities_data[entity_id] = entity_dict
         
-        with open(self.entities_file, 'w', encoding='utf-8') as f:
-            json.dump(entities_data, f, indent=2, ensure_ascii=False)
+        self._write_json(self.entities_file, entities_data)
         
         # Save relationships
         relationships_data = {}
         for rel_id, rel in self._relationships.items():
             relationships_data[rel_id] = asdict(rel)
         
-        with open(self.relationships_file, 'w', encoding='utf-8') as f:
-            json.dump(relationships_data, f, indent=2, ensure_ascii=False)
+        self._write_json(self.relationships_file, relationships_data)
         
         # Note: C4 mapping is dynamically generated, not saved to disk
     
@@ -225,8 +283,7 @@ class TextBasedKB(CodeKB):
         """Load the knowledge base from storage."""
         # Load entities
         if self.entities_file.exists():
-            with open(self.entities_file, 'r', encoding='utf-8') as f:
-                entities_data = json.load(f)
+            entities_data = self._read_json(self.entities_file)
             
             for entity_id, entity_dict in entities_data.items():
                 entity_dict['created_at'] = datetime.fromisoformat(entity_dict['created_at'])
@@ -234,8 +291,7 @@ class TextBasedKB(CodeKB):
         
         # Load relationships
         if self.relationships_file.exists():
-            with open(self.relationships_file, 'r', encoding='utf-8') as f:
-                relationships_data = json.load(f)
+            relationships_data = self._read_json(self.relationships_file)
             
             for rel_id, rel_dict in relationships_data.items():
                 self._relationships[rel_id] = CodeRelationship(**rel_dict)
@@ -866,11 +922,11 @@ class Neo4jKB(CodeKB):
             entity_degrees[rel.source_id] = entity_degrees.get(rel.source_id, 0) + 1
             entity_degrees[rel.target_id] = entity_degrees.get(rel.target_id, 0) + 1
         
-        # Sort by degree and return top entities
-        sorted_entities = sorted(entity_degrees.items(), key=lambda x: x[1], reverse=True)
+        # Select the top entities by degree without sorting them all
+        top_entities = heapq.nlargest(limit, entity_degrees.items(), key=lambda x: x[1])
         
         central_entities = []
-        for entity_id, degree in sorted_entities[:limit]:
+        for entity_id, degree in top_entities:
             if entity_id in self._entities:
                 central_entities.append((self._entities[entity_id], degree))
         
@@ -935,7 +991,7 @@ class Neo4jKB(CodeKB):
             patterns.append({
                 "pattern_type": "hub_entities",
                 "description": "Entities with high fan-out (potential bottlenecks)",
-                "entities": sorted(hubs, key=lambda x: x["connections"], reverse=True)[:5]
+                "entities": heapq.nlargest(5, hubs, key=lambda x: x["connections"])
             })
         
         return patterns
@@ -981,7 +1037,7 @@ class Neo4jKB(CodeKB):
                 if similar_id and similar_id in self._entities:
                     similar_entities.append((self._entities[similar_id], rel.strength))
         
-        return sorted(similar_entities, key=lambda x: x[1], reverse=True)[:10]
+        return heapq.nlargest(10, similar_entities, key=lambda x: x[1])
 
 
 def create_knowledge_base(kb_type: str, storage_path: str, **kwargs) -> CodeKB:
@@ -999,7 +1055,10 @@ def create_knowledge_base(kb_type: str, storage_path: str, **kwargs) -> CodeKB:
         from .vector_kb import VectorKB
         return VectorKB(
             storage_path=storage_path,
-            embedding_model=kwargs.get("embedding_model", "all-MiniLM-L6-v2")
+            embedding_model=kwargs.get("embedding_model", "all-MiniLM-L6-v2"),
+            index_type=kwargs.get("index_type", "flat"),
+            quantize_embeddings=kwargs.get("quantize_embeddings", False),
+            embedding_dtype=kwargs.get("embedding_dtype", "float32")
         )
     else:
         raise ValueError(f"Unsupported knowledge base type: {kb_type}")
\ No newline at end of file
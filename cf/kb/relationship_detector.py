@@ -43,7 +43,8 @@ class InheritanceInfo:
 class RelationshipDetector:
     """Detects relationships between code entities using AST analysis."""
     
-    def __init__(self):
+    def __init__(self, similarity_threshold: float = 0.7):
+        self.similarity_threshold = similarity_threshold
         self.relationships: List[CodeRelationship] = []
         self.current_file_path: str = ""
         self.current_entities: Dict[str, CodeEntity] = {}
@@ -489,14 +490,22 @@ class RelationshipDetector:
     def _detect_similar_entities(self, entities: Dict[str, CodeEntity]):
         """Detect entities with similar names or functionality."""
         entity_list = list(entities.values())
+        threshold = self.similarity_threshold
         
         for i, entity1 in enumerate(entity_list):
             for entity2 in entity_list[i+1:]:
                 if entity1.type == entity2.type and entity1.type in ["function", "class"]:
+                    # The edit distance is at least the length difference, so
+                    # names of very different lengths can't clear the threshold
+                    len1, len2 = len(entity1.name.lower()), len(entity2.name.lower())
+                    longest = max(len1, len2)
+                    if longest and 1.0 - abs(len1 - len2) / longest <= threshold:
+                        continue
+                    
                     # Calculate name similarity
                     similarity = self._calculate_name_similarity(entity1.name, entity2.name)
                     
-                    if similarity > 0.7:  # High similarity threshold
+                    if similarity > threshold:
                         relationship = CodeRelationship(
                             id=f"similar_{entity1.id}_{entity2.id}",
                             source_id=entity1.id,
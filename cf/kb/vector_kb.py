@@ -1,6 +1,5 @@
 """Vector database implementation for semantic code search."""
 
-import json
 import pickle
 import numpy as np
 from pathlib import Path
@@ -8,6 +7,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import hashlib
+import threading
 
 try:
     import faiss
@@ -17,15 +17,33 @@ except ImportError:
     faiss = None
 
 try:
+    import torch
     from sentence_transformers import SentenceTransformer
     SENTENCE_TRANSFORMERS_AVAILABLE = True
 except ImportError:
     SENTENCE_TRANSFORMERS_AVAILABLE = False
     SentenceTransformer = None
+    torch = None
 
 from .knowledge_base import CodeKB, CodeEntity, CodeRelationship
+from ..cache import LruCache
 from ..exceptions import KnowledgeBaseError
 
+# Loaded embedding models by name and quantization, shared across generators
+# so each model is loaded from disk once per process; failed loads aren't
+# recorded, so a later generator retries them
+_MODEL_CACHE: Dict[Tuple[str, bool], Any] = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+# HNSW graph parameters: neighbours per node, and candidate list sizes used
+# while building the graph and while searching it
+_HNSW_M = 16
+_HNSW_EF_CONSTRUCTION = 200
+_HNSW_EF_SEARCH = 64
+
+# Normalized query embeddings kept per knowledge base, evicted LRU-first
+_QUERY_EMBEDDING_CACHE_SIZE = 256
+
 
 @dataclass
 class CodeEmbedding:
@@ -39,25 +57,58 @@ class CodeEmbedding:
 class EmbeddingGenerator:
     """Generates embeddings for code entities."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", quantize: bool = False):
         self.model_name = model_name
-        self.model = None
-        self._load_model()
+        self.quantize = quantize
+        self._model = None
+        self._loader: Optional[threading.Thread] = None
+        
+        if SENTENCE_TRANSFORMERS_AVAILABLE:
+            # Load in the background so the caller can keep setting up (e.g.
+            # reading the stored KB) until the first embedding is needed
+            self._loader = threading.Thread(target=self._load_model, daemon=True)
+            self._loader.start()
+        else:
+            self._load_model()
+    
+    @property
+    def model(self):
+        """The loaded embedding model, or None for hash-based embeddings."""
+        if self._loader is not None:
+            self._loader.join()
+        return self._model
     
     def _load_model(self):
         """Load the embedding model."""
         if not SENTENCE_TRANSFORMERS_AVAILABLE:
             print(f"Warning: sentence-transformers not available. Using hash-based embeddings for demo.")
-            self.model = None
+            self._model = None
             return
         
-        try:
-            self.model = SentenceTransformer(self.model_name)
-        except Exception as e:
-            # Fallback to simple hash-based embeddings for demo
-            print(f"Warning: Could not load embedding model {self.model_name}: {e}")
-            print("Using simple hash-based embeddings for demo")
-            self.model = None
+        cache_key = (self.model_name, self.quantize)
+        with _MODEL_CACHE_LOCK:
+            if cache_key in _MODEL_CACHE:
+                self._model = _MODEL_CACHE[cache_key]
+                return
+            
+            try:
+                self._model = SentenceTransformer(self.model_name, device="cpu" if self.quantize else None)
+            except Exception as e:
+                # Fallback to simple hash-based embeddings for demo
+                print(f"Warning: Could not load embedding model {self.model_name}: {e}")
+                print("Using simple hash-based embeddings for demo")
+                self._model = None
+            
+            if self._model is not None and self.quantize:
+                try:
+                    # int8 weights for the linear layers, which dominate CPU encode time
+                    self._model = torch.quantization.quantize_dynamic(
+                        self._model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                except Exception as e:
+                    print(f"Warning: Could not quantize embedding model {self.model_name}: {e}")
+            if self._model is not None:
+                _MODEL_CACHE[cache_key] = self._model
     
     def generate_embedding(self, entity: CodeEntity) -> np.ndarray:
         """Generate embedding for a code entity."""
@@ -72,6 +123,16 @@ class EmbeddingGenerator:
             # Fallback: Simple hash-based embedding for demo
             return self._hash_based_embedding(text)
     
+    def generate_embeddings(self, entities: List[CodeEntity]) -> np.ndarray:
+        """Generate embeddings for several code entities, one row per entity."""
+        texts = [self._entity_to_text(entity) for entity in entities]
+        
+        if self.model is not None:
+            # One encode call lets the model batch the texts
+            return np.asarray(self.model.encode(texts), dtype=np.float32)
+        else:
+            return np.stack([self._hash_based_embedding(text) for text in texts])
+    
     def _entity_to_text(self, entity: CodeEntity) -> str:
         """Convert code entity to text for embedding."""
         # Combine different aspects of the entity
@@ -118,10 +179,15 @@ class EmbeddingGenerator:
 class VectorKB(CodeKB):
     """Vector database implementation using FAISS for semantic search."""
     
-    def __init__(self, storage_path: str, embedding_model: str = "all-MiniLM-L6-v2"):
+    def __init__(self, storage_path: str, embedding_model: str = "all-MiniLM-L6-v2",
+                 index_type: str = "flat", quantize_embeddings: bool = False,
+                 embedding_dtype: str = "float32"):
         super().__init__(storage_path)
         self.embedding_model = embedding_model
-        self.embedding_generator = EmbeddingGenerator(embedding_model)
+        self.index_type = index_type
+        # Element type of the saved embedding matrix; searches always run in float32
+        self.embedding_dtype = np.dtype(embedding_dtype)
+        self.embedding_generator = EmbeddingGenerator(embedding_model, quantize_embeddings)
         self.dimension = 384  # Default dimension for MiniLM
         
         # FAISS index
@@ -129,10 +195,25 @@ class VectorKB(CodeKB):
         self.embeddings: Dict[str, CodeEmbedding] = {}
         self.entity_id_to_index: Dict[str, int] = {}
         self.index_to_entity_id: Dict[int, str] = {}
+        self._query_embeddings = LruCache(_QUERY_EMBEDDING_CACHE_SIZE)
+        # Guards the query-embedding LRU and the lazy matrix build below,
+        # since concurrent plan steps search the same KB
+        self._cache_lock = threading.Lock()
+        
+        # Row-normalized embedding matrix for manual search, rebuilt lazily
+        # after embeddings change, with per-row entity ids, types and
+        # presence kept in parallel arrays so filters are vectorized
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[str] = []
+        self._matrix_rows: Dict[str, int] = {}
+        self._matrix_types: np.ndarray = np.empty(0, dtype=str)
+        self._matrix_present: np.ndarray = np.empty(0, dtype=bool)
         
         # File paths
         self.entities_file = self.storage_path / "entities.json"
-        self.embeddings_file = self.storage_path / "embeddings.pkl"
+        self.embeddings_file = self.storage_path / "embeddings.npy"
+        self.embeddings_meta_file = self.storage_path / "embeddings.json"
+        self.legacy_embeddings_file = self.storage_path / "embeddings.pkl"
         self.index_file = self.storage_path / "faiss.index"
         
         self._initialize_index()
@@ -140,7 +221,12 @@ class VectorKB(CodeKB):
     
     def _initialize_index(self):
         """Initialize FAISS index."""
-        if FAISS_AVAILABLE:
+        if FAISS_AVAILABLE and self.index_type == "hnsw":
+            # Approximate graph index: logarithmic search time on large KBs
+            self.index = faiss.IndexHNSWFlat(self.dimension, _HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            self.index.hnsw.efConstruction = _HNSW_EF_CONSTRUCTION
+            self.index.hnsw.efSearch = _HNSW_EF_SEARCH
+        elif FAISS_AVAILABLE:
             # Use FAISS index for fast similarity search
             self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
         else:
@@ -149,34 +235,45 @@ class VectorKB(CodeKB):
     
     def add_entity(self, entity: CodeEntity) -> None:
         """Add a code entity and generate its embedding."""
+        self.add_entities([entity])
+    
+    def add_entities(self, entities: List[CodeEntity]) -> None:
+        """Add code entities, generating their embeddings in one batch."""
+        if not entities:
+            return
+        
         # Add to base storage
-        self._entities[entity.id] = entity
+        for entity in entities:
+            self._entities[entity.id] = entity
         
-        # Generate embedding
+        # Generate embeddings
         try:
-            vector = self.embedding_generator.generate_embedding(entity)
-            embedding = CodeEmbedding(
-                entity_id=entity.id,
-                vector=vector,
-                metadata={"type": entity.type, "language": entity.language},
-                created_at=datetime.now()
-            )
-            
-            self.embeddings[entity.id] = embedding
+            vectors = self.embedding_generator.generate_embeddings(entities)
+            created_at = datetime.now()
+            for entity, vector in zip(entities, vectors):
+                self.embeddings[entity.id] = CodeEmbedding(
+                    entity_id=entity.id,
+                    vector=vector,
+                    metadata={"type": entity.type, "language": entity.language},
+                    created_at=created_at
+                )
+            self._matrix = None
             
             # Add to FAISS index
             if self.index is not None:
-                # Normalize vector for cosine similarity
-                normalized_vector = vector / np.linalg.norm(vector)
-                self.index.add(normalized_vector.reshape(1, -1))
+                # Normalize vectors for cosine similarity
+                normalized_vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+                first_index = self.index.ntotal
+                self.index.add(normalized_vectors)
                 
                 # Track mapping
-                index_id = self.index.ntotal - 1
-                self.entity_id_to_index[entity.id] = index_id
-                self.index_to_entity_id[index_id] = entity.id
+                for index_id, entity in enumerate(entities, first_index):
+                    self.entity_id_to_index[entity.id] = index_id
+                    self.index_to_entity_id[index_id] = entity.id
                 
         except Exception as e:
-            print(f"Warning: Could not generate embedding for {entity.id}: {e}")
+            entity_ids = ", ".join(entity.id for entity in entities)
+            print(f"Warning: Could not generate embeddings for {entity_ids}: {e}")
     
     def add_relationship(self, relationship: CodeRelationship) -> None:
         """Add a relationship between entities."""
@@ -223,8 +320,83 @@ class VectorKB(CodeKB):
             # Fallback to text-based search
             return super().search_entities(query, entity_type)[:limit]
     
+    def search_entities_batch(self, queries: List[str], limit: Optional[int] = None,
+                              entity_type: Optional[str] = None) -> Dict[str, List[CodeEntity]]:
+        """Search for several queries with one embedding pass and one similarity search."""
+        if limit is None:
+            limit = 10
+        results = {query: [] for query in queries}
+        texts = [query for query in results if query.strip()]
+        for query in results:
+            if not query.strip():
+                results[query] = self.search_entities(query, entity_type, limit)
+        if not texts:
+            return results
+        
+        try:
+            query_matrix = self._generate_query_embeddings(texts)
+            
+            if self.index is not None and self.index.ntotal > 0:
+                similarities, indices = self.index.search(query_matrix, min(limit * 2, self.index.ntotal))
+                for query, row in zip(texts, indices):
+                    matches = results[query]
+                    for idx in row:
+                        entity = self._entities.get(self.index_to_entity_id.get(idx))
+                        if entity and (not entity_type or entity.type == entity_type):
+                            matches.append(entity)
+                            if len(matches) >= limit:
+                                break
+            else:
+                candidate_mask = self._candidate_mask(entity_type)
+                for query, query_vector in zip(texts, query_matrix):
+                    results[query] = [
+                        self._entities[entity_id]
+                        for entity_id, _ in self._top_k_similar(query_vector, candidate_mask, limit)
+                    ]
+            return results
+        
+        except Exception as e:
+            print(f"Warning: Batched vector search failed, searching queries one at a time: {e}")
+            return super().search_entities_batch(queries, limit, entity_type)
+    
+    def _generate_query_embeddings(self, queries: List[str]) -> np.ndarray:
+        """Generate normalized embeddings for several queries, encoding uncached ones in one model call."""
+        vectors = {}
+        with self._cache_lock:
+            for query in queries:
+                cached = self._query_embeddings.get(query)
+                if cached is not None:
+                    vectors[query] = cached
+        
+        missing = [query for query in dict.fromkeys(queries) if query not in vectors]
+        if missing and self.embedding_generator.model is not None:
+            embeddings = np.asarray(self.embedding_generator.model.encode(missing), dtype=np.float32)
+            embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+            for query, vector in zip(missing, embeddings):
+                vectors[query] = self._cache_query_embedding(query, vector)
+        else:
+            for query in missing:
+                vectors[query] = self._generate_query_embedding(query)
+        
+        return np.stack([vectors[query] for query in queries]).astype(np.float32, copy=False)
+    
     def _generate_query_embedding(self, query: str) -> np.ndarray:
-        """Generate embedding for a search query."""
+        """Generate embedding for a search query, reusing it for repeated queries."""
+        with self._cache_lock:
+            cached = self._query_embeddings.get(query)
+            if cached is not None:
+                return cached
+        return self._cache_query_embedding(query, self._embed_query(query))
+    
+    def _cache_query_embedding(self, query: str, vector: np.ndarray) -> np.ndarray:
+        """Store a query embedding, read-only so callers can't corrupt the cache."""
+        vector.setflags(write=False)
+        with self._cache_lock:
+            self._query_embeddings.put(query, vector)
+        return vector
+    
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Encode and normalize a search query."""
         if self.embedding_generator.model is not None:
             embedding = self.embedding_generator.model.encode(query)
             normalized = embedding / np.linalg.norm(embedding)
@@ -236,19 +408,8 @@ class VectorKB(CodeKB):
     
     def _manual_similarity_search(self, query_vector: np.ndarray, entity_type: Optional[str], limit: int) -> List[CodeEntity]:
         """Manual similarity search when FAISS is not available."""
-        similarities = []
-        
-        for entity_id, embedding in self.embeddings.items():
-            entity = self._entities.get(entity_id)
-            if entity and (not entity_type or entity.type == entity_type):
-                # Calculate cosine similarity
-                entity_vector = embedding.vector / np.linalg.norm(embedding.vector)
-                similarity = np.dot(query_vector, entity_vector)
-                similarities.append((similarity, entity))
-        
-        # Sort by similarity and return top results
-        similarities.sort(key=lambda x: x[0], reverse=True)
-        return [entity for _, entity in similarities[:limit]]
+        candidate_mask = self._candidate_mask(entity_type)
+        return [self._entities[entity_id] for entity_id, _ in self._top_k_similar(query_vector, candidate_mask, limit)]
     
     def find_similar_entities(self, entity_id: str, limit: int = 5) -> List[Tuple[CodeEntity, float]]:
         """Find entities similar to the given entity."""
@@ -256,21 +417,60 @@ class VectorKB(CodeKB):
             return []
         
         source_embedding = self.embeddings[entity_id]
-        query_vector = source_embedding.vector / np.linalg.norm(source_embedding.vector)
+        vector = source_embedding.vector.astype(np.float32)
+        query_vector = vector / np.linalg.norm(vector)
         
-        similarities = []
-        for other_id, other_embedding in self.embeddings.items():
-            if other_id != entity_id:
-                other_vector = other_embedding.vector / np.linalg.norm(other_embedding.vector)
-                similarity = np.dot(query_vector, other_vector)
-                
-                entity = self._entities.get(other_id)
-                if entity:
-                    similarities.append((entity, float(similarity)))
+        candidate_mask = self._candidate_mask()
+        candidate_mask[self._matrix_rows[entity_id]] = False
+        return [
+            (self._entities[other_id], similarity)
+            for other_id, similarity in self._top_k_similar(query_vector, candidate_mask, limit)
+        ]
+    
+    def _candidate_mask(self, entity_type: Optional[str] = None) -> np.ndarray:
+        """Boolean row mask of embeddings whose entity exists and matches ``entity_type``."""
+        self._normalized_matrix()
+        if entity_type:
+            return self._matrix_present & (self._matrix_types == entity_type)
+        return self._matrix_present.copy()
+    
+    def _top_k_similar(self, query_vector: np.ndarray, candidate_mask: np.ndarray, limit: int) -> List[Tuple[str, float]]:
+        """Score masked rows against a normalized query vector and return the best ``limit``.
+        
+        Cosine similarity is a single product against the cached normalized
+        embedding matrix, and only the top ``limit`` scores are sorted.
+        """
+        rows = np.flatnonzero(candidate_mask)
+        if not len(rows) or limit <= 0:
+            return []
         
-        # Sort by similarity and return top results
-        similarities.sort(key=lambda x: x[1], reverse=True)
-        return similarities[:limit]
+        scores = (self._normalized_matrix() @ query_vector)[rows]
+        
+        k = min(limit, len(rows))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self._matrix_ids[rows[i]], float(scores[i])) for i in top]
+    
+    def _normalized_matrix(self) -> np.ndarray:
+        """Return all embeddings as L2-normalized float32 rows, building them on first use."""
+        matrix = self._matrix
+        if matrix is not None:
+            return matrix
+        with self._cache_lock:
+            if self._matrix is None:
+                entity_ids = list(self.embeddings)
+                entities = [self._entities.get(entity_id) for entity_id in entity_ids]
+                self._matrix_ids = entity_ids
+                self._matrix_rows = {entity_id: row for row, entity_id in enumerate(entity_ids)}
+                self._matrix_types = np.array([entity.type if entity else "" for entity in entities], dtype=str)
+                self._matrix_present = np.array([entity is not None for entity in entities], dtype=bool)
+                if entity_ids:
+                    matrix = np.stack([self.embeddings[entity_id].vector for entity_id in entity_ids]).astype(np.float32)
+                    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+                else:
+                    matrix = np.empty((0, self.dimension), dtype=np.float32)
+                self._matrix = matrix
+        return self._matrix
     
     def get_related_entities(self, entity_id: str, relationship_type: Optional[str] = None) -> List[Tuple[CodeEntity, CodeRelationship]]:
         """Get entities related to the given entity."""
@@ -299,8 +499,7 @@ class VectorKB(CodeKB):
             entity_dict['created_at'] = entity.created_at.isoformat()
             entities_data[entity_id] = entity_dict
         
-        with open(self.entities_file, 'w', encoding='utf-8') as f:
-            json.dump(entities_data, f, indent=2, ensure_ascii=False)
+        self._write_json(self.entities_file, entities_data)
         
         # Save relationships
         relationships_data = {}
@@ -308,17 +507,28 @@ class VectorKB(CodeKB):
             relationships_data[rel_id] = rel.__dict__
         
         relationships_file = self.storage_path / "relationships.json"
-        with open(relationships_file, 'w', encoding='utf-8') as f:
-            json.dump(relationships_data, f, indent=2, ensure_ascii=False)
-        
-        # Save embeddings
-        with open(self.embeddings_file, 'wb') as f:
-            pickle.dump({
-                'embeddings': self.embeddings,
-                'entity_id_to_index': self.entity_id_to_index,
-                'index_to_entity_id': self.index_to_entity_id,
-                'dimension': self.dimension
-            }, f)
+        self._write_json(relationships_file, relationships_data)
+        
+        # Save embeddings: vectors as one binary matrix, everything else as JSON
+        entity_ids = list(self.embeddings)
+        if entity_ids:
+            matrix = np.stack([self.embeddings[entity_id].vector for entity_id in entity_ids]).astype(self.embedding_dtype)
+        else:
+            matrix = np.empty((0, self.dimension), dtype=self.embedding_dtype)
+        # Loaded vectors are memory-mapped from the previous file, so replace
+        # it rather than overwrite it in place
+        tmp_file = self.embeddings_file.with_suffix(".npy.tmp")
+        with open(tmp_file, 'wb') as f:
+            np.save(f, matrix)
+        tmp_file.replace(self.embeddings_file)
+        
+        self._write_json(self.embeddings_meta_file, {
+            'dimension': self.dimension,
+            'entity_ids': entity_ids,
+            'metadata': [self.embeddings[entity_id].metadata for entity_id in entity_ids],
+            'created_at': [self.embeddings[entity_id].created_at.isoformat() for entity_id in entity_ids],
+            'entity_id_to_index': self.entity_id_to_index
+        })
         
         # Save FAISS index
         if self.index is not None and self.index.ntotal > 0:
@@ -328,8 +538,7 @@ class VectorKB(CodeKB):
         """Load the vector knowledge base from storage."""
         # Load entities
         if self.entities_file.exists():
-            with open(self.entities_file, 'r', encoding='utf-8') as f:
-                entities_data = json.load(f)
+            entities_data = self._read_json(self.entities_file)
             
             for entity_id, entity_dict in entities_data.items():
                 entity_dict['created_at'] = datetime.fromisoformat(entity_dict['created_at'])
@@ -338,17 +547,37 @@ class VectorKB(CodeKB):
         # Load relationships
         relationships_file = self.storage_path / "relationships.json"
         if relationships_file.exists():
-            with open(relationships_file, 'r', encoding='utf-8') as f:
-                relationships_data = json.load(f)
+            relationships_data = self._read_json(relationships_file)
             
             for rel_id, rel_dict in relationships_data.items():
                 self._relationships[rel_id] = CodeRelationship(**rel_dict)
         
-        # Load embeddings
-        if self.embeddings_file.exists():
-            with open(self.embeddings_file, 'rb') as f:
+        # Load embeddings; the matrix is memory-mapped, so vectors are read
+        # from disk only when a search touches them
+        if self.embeddings_file.exists() and self.embeddings_meta_file.exists():
+            meta = self._read_json(self.embeddings_meta_file)
+            matrix = np.load(self.embeddings_file, mmap_mode='r')
+            self.embeddings = {
+                entity_id: CodeEmbedding(
+                    entity_id=entity_id,
+                    vector=matrix[row],
+                    metadata=metadata,
+                    created_at=datetime.fromisoformat(created_at)
+                )
+                for row, (entity_id, metadata, created_at) in enumerate(
+                    zip(meta['entity_ids'], meta['metadata'], meta['created_at'])
+                )
+            }
+            self._matrix = None
+            self.entity_id_to_index = meta['entity_id_to_index']
+            self.index_to_entity_id = {index: entity_id for entity_id, index in self.entity_id_to_index.items()}
+            self.dimension = meta['dimension']
+        elif self.legacy_embeddings_file.exists():
+            # Knowledge bases saved before embeddings moved to .npy
+            with open(self.legacy_embeddings_file, 'rb') as f:
                 data = pickle.load(f)
                 self.embeddings = data['embeddings']
+                self._matrix = None
                 self.entity_id_to_index = data['entity_id_to_index']
                 self.index_to_entity_id = data['index_to_entity_id']
                 if 'dimension' in data:
@@ -363,6 +592,7 @@ class VectorKB(CodeKB):
         self._entities.clear()
         self._relationships.clear()
         self.embeddings.clear()
+        self._matrix = None
         self.entity_id_to_index.clear()
         self.index_to_entity_id.clear()
         
@@ -370,7 +600,8 @@ class VectorKB(CodeKB):
         self._initialize_index()
         
         # Remove files
-        for file_path in [self.entities_file, self.embeddings_file, self.index_file]:
+        for file_path in [self.entities_file, self.embeddings_file, self.embeddings_meta_file,
+                          self.legacy_embeddings_file, self.index_file]:
             if file_path.exists():
                 file_path.unlink()
     
@@ -1,12 +1,18 @@
 """LLM Model integration for CodeFusion using LiteLLM."""
 
+import hashlib
+import heapq
 import json
+import random
 import time
 import uuid
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Any, Union
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, replace
 from datetime import datetime
+from pathlib import Path
+
+from ..cache import LruCache
 
 try:
     import litellm
@@ -15,6 +21,41 @@ except ImportError:
     LITELLM_AVAILABLE = False
     litellm = None
 
+# Provider errors that usually succeed on a later attempt; looked up by name
+# because older litellm releases don't define all of them
+_TRANSIENT_LLM_ERROR_NAMES = (
+    "RateLimitError",
+    "Timeout",
+    "APIConnectionError",
+    "ServiceUnavailableError",
+    "InternalServerError",
+)
+_TRANSIENT_LLM_ERRORS = tuple(
+    error for error in (getattr(litellm, name, None) for name in _TRANSIENT_LLM_ERROR_NAMES)
+    if error is not None
+)
+
+
+def completion_with_retries(max_retries: int = 2, base_delay: float = 1.0,
+                            max_delay: float = 10.0, **params):
+    """Call ``litellm.completion``, retrying transient failures with exponential backoff.
+    
+    With ``stream=True`` only opening the stream is retried; errors raised
+    while iterating it reach the caller.
+    
+    Each wait is drawn uniformly up to the capped backoff ("full jitter") so
+    concurrent callers hitting the same rate limit don't retry in lockstep.
+    Non-transient errors (bad requests, authentication, parse problems) are
+    raised immediately.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return litellm.completion(**params)
+        except _TRANSIENT_LLM_ERRORS:
+            if attempt == max_retries:
+                raise
+            time.sleep(random.uniform(0, min(base_delay * (2 ** attempt), max_delay)))
+
 
 @dataclass
 class LlmMessage:
@@ -86,6 +127,7 @@ class LlmTracer:
             "total_requests": 0,
             "successful_requests": 0,
             "failed_requests": 0,
+            "cached_requests": 0,
             "total_tokens": 0,
             "total_cost": 0.0
         }
@@ -120,7 +162,10 @@ class LlmTracer:
             self.stats["failed_requests"] += 1
         else:
             self.stats["successful_requests"] += 1
-            if response and response.usage:
+            if trace.metadata.get("cached"):
+                # Served without a provider call, so no tokens were spent
+                self.stats["cached_requests"] += 1
+            elif response and response.usage:
                 self.stats["total_tokens"] += response.usage.get("total_tokens", 0)
     
     def get_trace(self, request_id: str) -> Optional[LlmTrace]:
@@ -129,12 +174,7 @@ class LlmTracer:
     
     def get_recent_traces(self, limit: int = 10) -> List[LlmTrace]:
         """Get recent traces."""
-        sorted_traces = sorted(
-            self.traces.values(),
-            key=lambda t: t.start_time,
-            reverse=True
-        )
-        return sorted_traces[:limit]
+        return heapq.nlargest(limit, self.traces.values(), key=lambda t: t.start_time)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get tracing statistics."""
@@ -145,9 +185,6 @@ class LlmTracer:
         if not self.storage_path:
             return
         
-        import json
-        from pathlib import Path
-        
         storage_file = Path(self.storage_path) / "llm_traces.json"
         storage_file.parent.mkdir(parents=True, exist_ok=True)
         
@@ -192,7 +229,8 @@ class LiteLlmModel(LlmModel):
     """LiteLLM-based model implementation."""
     
     def __init__(self, model_name: str, api_key: Optional[str] = None, 
-                 base_url: Optional[str] = None, tracer: Optional[LlmTracer] = None):
+                 base_url: Optional[str] = None, tracer: Optional[LlmTracer] = None,
+                 max_retries: int = 2, cache_size: int = 128):
         super().__init__(model_name, tracer)
         
         if not LITELLM_AVAILABLE:
@@ -200,6 +238,12 @@ class LiteLlmModel(LlmModel):
         
         self.api_key = api_key
         self.base_url = base_url
+        self.max_retries = max_retries
+        
+        # Responses keyed by a hash of the request, evicted LRU-first; a
+        # cache_size of 0 disables caching
+        self.cache_size = cache_size
+        self._response_cache = LruCache(cache_size)
         
         # Configure LiteLLM
         if api_key:
@@ -208,31 +252,52 @@ class LiteLlmModel(LlmModel):
             litellm.api_base = base_url
     
     def generate(self, messages: List[LlmMessage], **kwargs) -> LlmResponse:
-        """Generate a response using LiteLLM."""
+        """Generate a response using LiteLLM.
+        
+        Identical requests (same model, messages and sampling parameters) are
+        answered from an in-process cache without calling the provider; the
+        tracer still records them, flagged ``cached`` in the trace metadata.
+        """
+        # Convert messages to LiteLLM format
+        llm_messages = []
+        for msg in messages:
+            llm_messages.append({
+                "role": msg.role,
+                "content": msg.content
+            })
+        
+        # Set default parameters
+        params = {
+            "model": self.model_name,
+            "messages": llm_messages,
+            "temperature": kwargs.get("temperature", 0.1),
+            "max_tokens": kwargs.get("max_tokens", 1000)
+        }
+        
+        cache_key = None
+        cached = None
+        if self.cache_size > 0:
+            cache_key = hashlib.blake2b(
+                json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8"), digest_size=16
+            ).hexdigest()
+            cached = self._response_cache.get(cache_key)
+        
         # Start tracing
         request_id = None
         if self.tracer:
-            request_id = self.tracer.start_trace(messages, {"model": self.model_name})
+            request_id = self.tracer.start_trace(
+                messages, {"model": self.model_name, "cached": cached is not None}
+            )
+        
+        if cached is not None:
+            llm_response = replace(cached, timestamp=datetime.now(), request_id=request_id or str(uuid.uuid4()))
+            if self.tracer and request_id:
+                self.tracer.end_trace(request_id, llm_response)
+            return llm_response
         
         try:
-            # Convert messages to LiteLLM format
-            llm_messages = []
-            for msg in messages:
-                llm_messages.append({
-                    "role": msg.role,
-                    "content": msg.content
-                })
-            
-            # Set default parameters
-            params = {
-                "model": self.model_name,
-                "messages": llm_messages,
-                "temperature": kwargs.get("temperature", 0.1),
-                "max_tokens": kwargs.get("max_tokens", 1000)
-            }
-            
-            # Make the API call
-            response = litellm.completion(**params)
+            # Make the API call, retrying rate limits and provider hiccups
+            response = completion_with_retries(max_retries=self.max_retries, **params)
             
             # Extract response data
             content = response.choices[0].message.content
@@ -250,6 +315,9 @@ class LiteLlmModel(LlmModel):
             if self.tracer and request_id:
                 self.tracer.end_trace(request_id, llm_response)
             
+            if cache_key is not None:
+                self._response_cache.put(cache_key, llm_response)
+            
             return llm_response
             
         except Exception as e:
@@ -302,7 +370,8 @@ def create_llm_model(model_type: str, model_name: str, **kwargs) -> LlmModel:
             model_name=model_name,
             api_key=kwargs.get("api_key"),
             base_url=kwargs.get("base_url"),
-            tracer=tracer
+            tracer=tracer,
+            cache_size=kwargs.get("cache_size", 128)
         )
     elif model_type == "mock":
         return MockLlmModel(model_name=model_name, tracer=tracer)
@@ -313,8 +382,10 @@ def create_llm_model(model_type: str, model_name: str, **kwargs) -> LlmModel:
 class CodeAnalysisLlm:
     """High-level LLM interface for code analysis tasks."""
     
-    def __init__(self, llm_model: LlmModel):
+    def __init__(self, llm_model: LlmModel, max_context_chars: int = 24000):
         self.llm = llm_model
+        # Upper bound on context sent with a prompt (~4 characters per token)
+        self.max_context_chars = max_context_chars
     
     def explain_code(self, code: str, language: str = "unknown") -> str:
         """Get an explanation of code functionality."""
@@ -333,9 +404,18 @@ Provide a clear, concise explanation of:
     
     def analyze_architecture(self, files_summary: Dict[str, str]) -> str:
         """Analyze overall architecture from file summaries."""
-        context = "File summaries:\n"
-        for file_path, summary in files_summary.items():
-            context += f"\n{file_path}: {summary}"
+        # Include whole summaries until the context budget is spent, then
+        # note how many files were left out
+        parts = ["File summaries:\n"]
+        used = len(parts[0])
+        for included, (file_path, summary) in enumerate(files_summary.items()):
+            entry = f"\n{file_path}: {summary}"
+            if used + len(entry) > self.max_context_chars:
+                parts.append(f"\n... {len(files_summary) - included} more files omitted")
+                break
+            parts.append(entry)
+            used += len(entry)
+        context = "".join(parts)
         
         prompt = """Based on the file summaries provided, analyze the overall architecture:
 
@@ -365,4 +445,6 @@ Focus on:
     
     def answer_code_question(self, question: str, code_context: str) -> str:
         """Answer a specific question about code."""
+        if len(code_context) > self.max_context_chars:
+            code_context = code_context[:self.max_context_chars] + "\n... [context truncated]"
         return self.llm.ask_question(question, code_context)
\ No newline at end of file
@@ -136,7 +136,10 @@ Examples:
         self.kb = create_knowledge_base(
             kb_type=self.config.kb_type,
             storage_path=self.config.kb_path,
-            embedding_model=self.config.embedding_model
+            embedding_model=self.config.embedding_model,
+            index_type=self.config.vector_index_type,
+            quantize_embeddings=self.config.quantize_embeddings,
+            embedding_dtype=self.config.embedding_dtype
         )
         
         # Setup indexer
@@ -341,6 +344,7 @@ max_exploration_depth: {self.config.max_exploration_depth}
             
             # Use different strategies based on user choice
             strategy = getattr(args, 'strategy', 'react')
+            verbose = getattr(args, 'verbose', False)
             
             if strategy == 'react':
                 # Use advanced reasoning agent (ReAct strategy)
@@ -354,16 +358,16 @@ max_exploration_depth: {self.config.max_exploration_depth}
                 except:
                     pass
                 
-                # Perform agentic reasoning
+                # Perform agentic reasoning, printing the answer as it streams in
+                print(f"\n💡 Comprehensive Answer (ReAct Strategy):")
                 reasoning_result = reasoning_agent.reason_about_question(
-                    args.question, entities, kb_results
+                    args.question, entities, kb_results,
+                    on_chunk=lambda chunk: print(chunk, end="", flush=True)
                 )
-                
-                print(f"\n💡 Comprehensive Answer (ReAct Strategy):")
-                print(reasoning_result.final_answer)
+                print()
                 
                 # Show reasoning steps if verbose
-                if hasattr(args, 'verbose') and args.verbose:
+                if verbose:
                     print(f"\n🔍 Reasoning Steps:")
                     for i, step in enumerate(reasoning_result.reasoning_steps, 1):
                         print(f"\n{i}. {step.step_type.title()}: {step.question}")
@@ -380,11 +384,11 @@ max_exploration_depth: {self.config.max_exploration_depth}
                 # Use Plan-then-Act strategy
                 from ..agents.plan_then_act import PlanThenActAgent
                 
-                if not hasattr(args, 'repo_path') or not args.repo_path:
+                if not getattr(args, 'repo_path', None):
                     print("Error: --repo-path is required for plan_act strategy")
                     return
                 
-                plan_agent = PlanThenActAgent(self.config, self.kb)
+                plan_agent = PlanThenActAgent(self.config, self.kb, system_access)
                 plan_result = plan_agent.explore_codebase(args.question, args.repo_path)
                 
                 print(f"\n💡 Comprehensive Answer (Plan-then-Act Strategy):")
@@ -401,7 +405,7 @@ max_exploration_depth: {self.config.max_exploration_depth}
                     print(f"   • {insight}")
                 
                 # Show plan steps if verbose
-                if hasattr(args, 'verbose') and args.verbose:
+                if verbose:
                     print(f"\n🔍 Execution Steps:")
                     for i, step in enumerate(plan_result.executed_steps, 1):
                         print(f"\n{i}. {step.description}")
@@ -414,11 +418,11 @@ max_exploration_depth: {self.config.max_exploration_depth}
                 # Use Sense-then-Act strategy
                 from ..agents.sense_then_act import SenseThenActAgent
                 
-                if not hasattr(args, 'repo_path') or not args.repo_path:
+                if not getattr(args, 'repo_path', None):
                     print("Error: --repo-path is required for sense_act strategy")
                     return
                 
-                sense_agent = SenseThenActAgent(self.config, self.kb)
+                sense_agent = SenseThenActAgent(self.config, self.kb, system_access)
                 session_result = sense_agent.explore_codebase(args.question, args.repo_path)
                 
                 print(f"\n💡 Comprehensive Answer (Sense-then-Act Strategy):")
@@ -431,7 +435,7 @@ max_exploration_depth: {self.config.max_exploration_depth}
                 print(f"   • Success Rate: {session_result.success_rate:.2f}")
                 
                 # Show cycles if verbose
-                if hasattr(args, 'verbose') and args.verbose:
+                if verbose:
                     print(f"\n🔍 Exploration Cycles:")
                     for cycle in session_result.cycles:
                         print(f"\nCycle {cycle.cycle_id}: {cycle.sense_result.focus_area}")
@@ -1,5 +1,6 @@
 """Tests for configuration management."""
 
+import json
 import pytest
 import tempfile
 import yaml
@@ -62,6 +63,29 @@ class TestCfConfig:
         finally:
             Path(temp_path).unlink()
     
+    def test_config_from_json_file(self):
+        """Test configuration loading from JSON file."""
+        config_data = {
+            "repo_path": "/test/repo",
+            "llm_model": "claude-3",
+            "kb_type": "vector",
+            "excluded_dirs": [".git", "build"]
+        }
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(config_data, f)
+            temp_path = f.name
+        
+        try:
+            config = CfConfig.from_file(temp_path)
+            
+            assert config.repo_path == "/test/repo"
+            assert config.llm_model == "claude-3"
+            assert config.kb_type == "vector"
+            assert config.excluded_dirs == [".git", "build"]
+        finally:
+            Path(temp_path).unlink()
+    
     def test_config_validation(self):
         """Test configuration validation."""
         # Valid config should not raise
@@ -78,6 +102,30 @@ class TestCfConfig:
         config.exploration_strategy = "invalid"
         with pytest.raises(ValueError):
             config.validate()
+        
+        # Invalid vector index type should raise
+        config.exploration_strategy = "react"
+        config.vector_index_type = "invalid"
+        with pytest.raises(ValueError):
+            config.validate()
+        
+        # Invalid embedding dtype should raise
+        config.vector_index_type = "flat"
+        config.embedding_dtype = "int4"
+        with pytest.raises(ValueError):
+            config.validate()
+        
+        # Non-positive synthesis step budget should raise
+        config.embedding_dtype = "float32"
+        config.llm_max_step_chars = 0
+        with pytest.raises(ValueError):
+            config.validate()
+        
+        # Relationship similarity threshold outside 0-1 should raise
+        config.llm_max_step_chars = 1000
+        config.relationship_similarity_threshold = 1.5
+        with pytest.raises(ValueError):
+            config.validate()
     
     def test_config_to_dict(self):
         """Test configuration serialization to dictionary."""
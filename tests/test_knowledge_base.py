@@ -1,5 +1,7 @@
 """Tests for knowledge base functionality."""
 
+import pickle
+import numpy as np
 import pytest
 import tempfile
 import shutil
@@ -9,6 +11,8 @@ from pathlib import Path
 from cf.kb.knowledge_base import (
     CodeEntity, CodeRelationship, TextBasedKB, create_knowledge_base
 )
+from cf.kb import vector_kb
+from cf.kb.vector_kb import EmbeddingGenerator, VectorKB
 from cf.exceptions import KnowledgeBaseError
 
 
@@ -150,6 +154,32 @@ class TestTextBasedKB:
         results = self.kb.search_entities("class", entity_type="class")
         assert len(results) == 2
     
+    def test_search_entities_batch(self):
+        """Test searching for several queries in one call."""
+        entity1 = CodeEntity(
+            id="e1", name="DatabaseManager", type="class", path="db.py",
+            content="class DatabaseManager: ...", language="python",
+            size=50, created_at=datetime.now(), metadata={}
+        )
+        entity2 = CodeEntity(
+            id="e2", name="UserController", type="class", path="user.py",
+            content="class UserController: ...", language="python",
+            size=30, created_at=datetime.now(), metadata={}
+        )
+        
+        self.kb.add_entity(entity1)
+        self.kb.add_entity(entity2)
+        
+        results = self.kb.search_entities_batch(["Database", "User", "missing", ""], limit=1)
+        assert [e.id for e in results["Database"]] == ["e1"]
+        assert [e.id for e in results["User"]] == ["e2"]
+        assert results["missing"] == []
+        assert len(results[""]) == 1
+        
+        # Unlimited batch matches the single-query search
+        results = self.kb.search_entities_batch(["class"])
+        assert results["class"] == self.kb.search_entities("class")
+    
     def test_save_and_load(self):
         """Test saving and loading the knowledge base."""
         entity = CodeEntity(
@@ -201,6 +231,119 @@ class TestTextBasedKB:
         assert len(self.kb._entities) == 0
 
 
+class TestVectorKB:
+    """Test cases for VectorKB class."""
+    
+    def setup_method(self):
+        """Set up test environment."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.kb = VectorKB(self.temp_dir)
+        self.kb.add_entities([
+            CodeEntity(
+                id="e1", name="DatabaseManager", type="class", path="db.py",
+                content="class DatabaseManager: ...", language="python",
+                size=50, created_at=datetime.now(), metadata={}
+            ),
+            CodeEntity(
+                id="e2", name="UserController", type="class", path="user.py",
+                content="class UserController: ...", language="python",
+                size=30, created_at=datetime.now(), metadata={}
+            ),
+            CodeEntity(
+                id="e3", name="load_config", type="function", path="config.py",
+                content="def load_config(path): ...", language="python",
+                size=25, created_at=datetime.now(), metadata={}
+            ),
+        ])
+    
+    def teardown_method(self):
+        """Clean up test environment."""
+        shutil.rmtree(self.temp_dir)
+    
+    def test_save_and_load(self):
+        """Test saving and loading embeddings through the .npy matrix."""
+        self.kb.save()
+        assert (Path(self.temp_dir) / "embeddings.npy").exists()
+        assert (Path(self.temp_dir) / "embeddings.json").exists()
+        
+        # Create new KB instance and load
+        new_kb = VectorKB(self.temp_dir)
+        
+        assert set(new_kb.embeddings) == {"e1", "e2", "e3"}
+        assert new_kb.entity_id_to_index == self.kb.entity_id_to_index
+        for entity_id, embedding in self.kb.embeddings.items():
+            assert (new_kb.embeddings[entity_id].vector == embedding.vector).all()
+        
+        expected = [e.id for e in self.kb.search_entities("database manager")]
+        assert [e.id for e in new_kb.search_entities("database manager")] == expected
+    
+    def test_load_legacy_pickle(self):
+        """Test loading embeddings saved in the old pickle format."""
+        self.kb.save()
+        (Path(self.temp_dir) / "embeddings.npy").unlink()
+        (Path(self.temp_dir) / "embeddings.json").unlink()
+        with open(Path(self.temp_dir) / "embeddings.pkl", 'wb') as f:
+            pickle.dump({
+                'embeddings': self.kb.embeddings,
+                'entity_id_to_index': self.kb.entity_id_to_index,
+                'index_to_entity_id': self.kb.index_to_entity_id,
+                'dimension': self.kb.dimension
+            }, f)
+        
+        new_kb = VectorKB(self.temp_dir)
+        
+        assert set(new_kb.embeddings) == {"e1", "e2", "e3"}
+        assert new_kb.index_to_entity_id == self.kb.index_to_entity_id
+        expected = [e.id for e in self.kb.search_entities("user controller")]
+        assert [e.id for e in new_kb.search_entities("user controller")] == expected
+    
+    def test_save_and_load_float16(self):
+        """Test saving embeddings at half precision."""
+        kb = VectorKB(self.temp_dir, embedding_dtype="float16")
+        kb.add_entities(list(self.kb._entities.values()))
+        kb.save()
+        
+        new_kb = VectorKB(self.temp_dir, embedding_dtype="float16")
+        
+        assert new_kb.embeddings["e1"].vector.dtype == "float16"
+        for entity_id, embedding in self.kb.embeddings.items():
+            assert np.allclose(new_kb.embeddings[entity_id].vector, embedding.vector, atol=1e-3)
+        assert len(new_kb.search_entities("database manager", limit=3)) == 3
+    
+    def test_search_entities_batch(self):
+        """Test that batch search matches per-query search."""
+        queries = ["database manager", "user controller", "load config"]
+        
+        results = self.kb.search_entities_batch(queries, limit=2)
+        
+        for query in queries:
+            assert [e.id for e in results[query]] == [e.id for e in self.kb.search_entities(query, limit=2)]
+
+
+class TestEmbeddingGenerator:
+    """Test cases for EmbeddingGenerator class."""
+    
+    def test_failed_model_load_is_retried(self, monkeypatch):
+        """Test that a failed load isn't cached for later generators."""
+        attempts = []
+        
+        def load_model(model_name, device=None):
+            attempts.append(model_name)
+            if len(attempts) == 1:
+                raise OSError("hub timeout")
+            return object()
+        
+        monkeypatch.setattr(vector_kb, "SENTENCE_TRANSFORMERS_AVAILABLE", True)
+        monkeypatch.setattr(vector_kb, "SentenceTransformer", load_model)
+        monkeypatch.setattr(vector_kb, "_MODEL_CACHE", {})
+        
+        assert EmbeddingGenerator("test-model").model is None
+        loaded = EmbeddingGenerator("test-model").model
+        assert loaded is not None
+        assert EmbeddingGenerator("test-model").model is loaded
+        assert len(attempts) == 2
+
+
 class TestKnowledgeBaseFactory:
     """Test cases for knowledge base factory function."""
     
@@ -0,0 +1,126 @@
+"""Tests for LLM model integration."""
+
+import pytest
+from types import SimpleNamespace
+
+from cf.llm import llm_model
+from cf.llm.llm_model import LiteLlmModel, LlmMessage, LlmTracer, completion_with_retries
+
+
+class FakeLitellm:
+    """Stands in for litellm, counting completion calls."""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def completion(self, **params):
+        self.calls += 1
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="It parses the config."))],
+            usage={"prompt_tokens": 20, "completion_tokens": 5, "total_tokens": 25}
+        )
+
+
+class RateLimitError(Exception):
+    """Stands in for litellm's transient rate-limit error."""
+
+
+class FlakyLitellm:
+    """Stands in for litellm, raising queued errors before succeeding."""
+    
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+    
+    def completion(self, **params):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "response"
+
+
+class TestCompletionWithRetries:
+    """Test cases for the retrying completion helper."""
+    
+    @pytest.fixture(autouse=True)
+    def no_sleep(self, monkeypatch):
+        """Record backoff waits instead of sleeping."""
+        self.delays = []
+        monkeypatch.setattr(llm_model.time, "sleep", self.delays.append)
+        monkeypatch.setattr(llm_model, "_TRANSIENT_LLM_ERRORS", (RateLimitError,))
+    
+    def test_transient_error_is_retried(self, monkeypatch):
+        """Test that a transient error is retried until the call succeeds."""
+        fake = FlakyLitellm([RateLimitError(), RateLimitError()])
+        monkeypatch.setattr(llm_model, "litellm", fake)
+        
+        assert completion_with_retries(max_retries=2, model="gpt-4o", messages=[]) == "response"
+        
+        assert fake.calls == 3
+        assert len(self.delays) == 2
+    
+    def test_non_transient_error_is_not_retried(self, monkeypatch):
+        """Test that other errors are raised on the first attempt."""
+        fake = FlakyLitellm([ValueError("bad request")])
+        monkeypatch.setattr(llm_model, "litellm", fake)
+        
+        with pytest.raises(ValueError):
+            completion_with_retries(max_retries=2, model="gpt-4o", messages=[])
+        
+        assert fake.calls == 1
+        assert self.delays == []
+    
+    def test_gives_up_after_max_retries(self, monkeypatch):
+        """Test that the last transient error is raised once attempts run out."""
+        fake = FlakyLitellm([RateLimitError()] * 5)
+        monkeypatch.setattr(llm_model, "litellm", fake)
+        
+        with pytest.raises(RateLimitError):
+            completion_with_retries(max_retries=2, model="gpt-4o", messages=[])
+        
+        assert fake.calls == 3
+        assert len(self.delays) == 2
+    
+    def test_backoff_is_capped_at_max_delay(self, monkeypatch):
+        """Test that jittered waits grow exponentially but never exceed max_delay."""
+        # Always draw the upper bound so the waits show the backoff schedule
+        monkeypatch.setattr(llm_model.random, "uniform", lambda low, high: high)
+        fake = FlakyLitellm([RateLimitError()] * 5)
+        monkeypatch.setattr(llm_model, "litellm", fake)
+        
+        completion_with_retries(max_retries=5, base_delay=1.0, max_delay=3.0,
+                                model="gpt-4o", messages=[])
+        
+        assert self.delays == [1.0, 2.0, 3.0, 3.0, 3.0]
+
+
+class TestLiteLlmModel:
+    """Test cases for LiteLlmModel class."""
+    
+    @pytest.fixture(autouse=True)
+    def fake_llm(self, monkeypatch):
+        """Route LLM calls to a fake."""
+        self.llm = FakeLitellm()
+        monkeypatch.setattr(llm_model, "litellm", self.llm)
+        monkeypatch.setattr(llm_model, "LITELLM_AVAILABLE", True)
+    
+    def test_cached_response_is_traced(self):
+        """Test that a response served from the cache is still traced."""
+        tracer = LlmTracer()
+        model = LiteLlmModel("gpt-4o", tracer=tracer)
+        messages = [LlmMessage(role="user", content="What does config.py do?")]
+        
+        first = model.generate(messages)
+        second = model.generate(messages)
+        
+        assert self.llm.calls == 1
+        assert second.content == first.content
+        assert second.request_id != first.request_id
+        assert tracer.get_trace(second.request_id).metadata["cached"] is True
+        assert tracer.get_trace(first.request_id).metadata["cached"] is False
+        
+        stats = tracer.get_stats()
+        assert stats["total_requests"] == 2
+        assert stats["successful_requests"] == 2
+        assert stats["cached_requests"] == 1
+        assert stats["total_tokens"] == 25
@@ -0,0 +1,105 @@
+"""Tests for the reasoning agent's result cache."""
+
+import pytest
+from datetime import datetime
+from types import SimpleNamespace
+
+from cf.agents import reasoning_agent
+from cf.agents.reasoning_agent import ReasoningAgent
+from cf.cache import LruCache
+from cf.config import CfConfig
+from cf.kb.knowledge_base import CodeEntity
+from cf.llm import llm_model
+
+
+class FakeLitellm:
+    """Stands in for litellm, answering decomposition and synthesis prompts."""
+    
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+    
+    def completion(self, **params):
+        self.calls += 1
+        if self.fail:
+            raise ValueError("model unavailable")
+        system_prompt = params["messages"][0]["content"]
+        if system_prompt == reasoning_agent._DECOMPOSITION_SYSTEM_PROMPT:
+            content = '["How is the database configured?"]'
+        else:
+            content = "Configure the database in settings.py."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+class TestReasoningResultCache:
+    """Test cases for memoized reasoning results."""
+    
+    @pytest.fixture(autouse=True)
+    def fake_llm(self, monkeypatch):
+        """Route LLM calls to a fake and start from empty caches."""
+        self.llm = FakeLitellm()
+        monkeypatch.setattr(reasoning_agent, "litellm", self.llm, raising=False)
+        monkeypatch.setattr(reasoning_agent, "LITELLM_AVAILABLE", True)
+        monkeypatch.setattr(llm_model, "litellm", self.llm)
+        monkeypatch.setattr(reasoning_agent, "_RESULT_CACHE", LruCache(8))
+        monkeypatch.setattr(reasoning_agent, "_ANALYSIS_CACHE", LruCache(8))
+        
+        self.agent = ReasoningAgent(CfConfig(llm_api_key="test-key"))
+        self.entities = [
+            CodeEntity(
+                id="settings_py", name="settings.py", type="file", path="app/settings.py",
+                content="DATABASE_URL = 'sqlite:///app.db'", language="python",
+                size=34, created_at=datetime.now(), metadata={}
+            )
+        ]
+    
+    def test_normalized_question_hits_cache(self):
+        """Test that a question differing only in case and spacing reuses the result."""
+        first = self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        calls = self.llm.calls
+        
+        second = self.agent.reason_about_question("  how do I   configure the DATABASE? ", self.entities, [])
+        
+        assert self.llm.calls == calls
+        assert second.final_answer == first.final_answer
+        assert second.original_question == "  how do I   configure the DATABASE? "
+    
+    def test_cached_result_is_a_copy(self):
+        """Test that modifying a returned result doesn't change later hits."""
+        first = self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        first.final_answer = "changed"
+        first.reasoning_steps[-1].answer = "changed"
+        
+        second = self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        
+        assert second.final_answer == "Configure the database in settings.py."
+        assert second.reasoning_steps[-1].answer == "Configure the database in settings.py."
+        second.reasoning_steps.clear()
+        
+        third = self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        assert len(third.reasoning_steps) == 3
+    
+    def test_bypass_cache(self):
+        """Test that bypass_cache forces a fresh run."""
+        self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        calls = self.llm.calls
+        
+        self.agent.reason_about_question("How do I configure the database?", self.entities, [],
+                                         bypass_cache=True)
+        
+        assert self.llm.calls > calls
+    
+    def test_degraded_result_not_cached(self):
+        """Test that a rule-based fallback after an LLM error is not memoized."""
+        self.llm.fail = True
+        degraded = self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        
+        assert any(step.degraded for step in degraded.reasoning_steps)
+        assert len(reasoning_agent._RESULT_CACHE) == 0
+        
+        self.llm.fail = False
+        result = self.agent.reason_about_question("How do I configure the database?", self.entities, [])
+        
+        assert not any(step.degraded for step in result.reasoning_steps)
+        assert result.final_answer == "Configure the database in settings.py."
+        assert len(reasoning_agent._RESULT_CACHE) == 1